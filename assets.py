@@ -0,0 +1,146 @@
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+# Self-hosted static assets. `python assets.py` builds the stylesheet and the
+# banner images into ./static as content-hashed files (plus .gz/.br siblings
+# for a reverse proxy to serve precompressed), and writes a manifest that the
+# app reads to link them. Streamlit serves ./static at app/static/ when
+# server.enableStaticServing is on (see .streamlit/config.toml). Importing this
+# module does no I/O; the manifest is read on first lookup.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(ROOT, "assets")
+STATIC_DIR = os.path.join(ROOT, "static")
+MANIFEST_PATH = os.path.join(STATIC_DIR, "manifest.json")
+STATIC_URL = "app/static/"
+
+# name -> (width, height, background, foreground, text); same look as the
+# placehold.co images they replace.
+BANNERS = {
+    "header.svg": (1200, 300, "#000000", "#FF6F00", "Your Health Journey Starts Now"),
+    "thali.svg": (800, 300, "#272727", "#FFFFFF", "Healthy Indian Thali"),
+    "workout.svg": (800, 300, "#272727", "#FFFFFF", "Start Your Fitness Journey"),
+    "calm.svg": (800, 300, "#272727", "#FFFFFF", "Find Your Calm"),
+}
+
+
+# --- Runtime Lookup ---
+def _load_manifest():
+    try:
+        with open(MANIFEST_PATH) as f: return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+@lru_cache(maxsize=None)
+def manifest():
+    return _load_manifest()
+
+
+def url(name):
+    if name not in manifest():
+        raise KeyError(f"Static asset '{name}' is not built; run `python assets.py`.")
+    return STATIC_URL + manifest()[name]
+
+
+def stylesheet_tag():
+    return f'<link rel="stylesheet" href="{url("app.css")}">'
+
+
+def img_tag(name, style="border-radius: 10px; margin-bottom: 20px; width: 100%;"):
+    return f"<img src='{url(name)}' style='{style}'>"
+
+
+@lru_cache(maxsize=None)
+def _read(name):
+    with open(os.path.join(STATIC_DIR, manifest()[name]), "rb") as f: return f.read()
+
+
+def stylesheet_css():
+    return _read("app.css").decode()
+
+
+def inline(html):
+    # Swap static URLs for data URIs so the HTML stands on its own (downloads, emails).
+    for name, hashed in manifest().items():
+        if name.endswith(".svg") and STATIC_URL + hashed in html:
+            data = base64.b64encode(_read(name)).decode()
+            html = html.replace(STATIC_URL + hashed, f"data:image/svg+xml;base64,{data}")
+    return html
+
+
+# --- Build ---
+def minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{}:;,>])\s*", r"\1", css).replace(";}", "}").strip()
+
+
+def banner_svg(width, height, bg, fg, text):
+    font_size = round(min(height * 0.2, width * 0.9 / (0.55 * len(text))))
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+        f'<rect width="100%" height="100%" fill="{bg}"/>'
+        f'<text x="50%" y="50%" fill="{fg}" font-family="Poppins, sans-serif" font-size="{font_size}" '
+        f'text-anchor="middle" dominant-baseline="central">{escape(text)}</text></svg>'
+    )
+
+
+def _write_hashed(name, data):
+    stem, ext = os.path.splitext(name)
+    hashed = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+    path = os.path.join(STATIC_DIR, hashed)
+    with open(path, "wb") as f: f.write(data)
+    sizes = {"raw": len(data)}
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    with open(path + ".gz", "wb") as f: f.write(gz)
+    sizes["gz"] = len(gz)
+    try:
+        import brotli
+    except ImportError:
+        pass
+    else:
+        br = brotli.compress(data, quality=11)
+        with open(path + ".br", "wb") as f: f.write(br)
+        sizes["br"] = len(br)
+    return hashed, sizes
+
+
+def build():
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    stale = set(_load_manifest().values())
+    with open(os.path.join(SOURCE_DIR, "app.css")) as f:
+        sources = {"app.css": minify_css(f.read()).encode()}
+    sources.update({name: banner_svg(*spec).encode() for name, spec in BANNERS.items()})
+
+    built, report = {}, {}
+    for name, data in sources.items():
+        built[name], report[name] = _write_hashed(name, data)
+    for old in stale - set(built.values()):
+        for suffix in ("", ".gz", ".br"):
+            if os.path.exists(os.path.join(STATIC_DIR, old + suffix)):
+                os.remove(os.path.join(STATIC_DIR, old + suffix))
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(built, f, indent=2, sort_keys=True)
+        f.write("\n")
+    manifest.cache_clear()
+    _read.cache_clear()
+    return built, report
+
+
+def main(argv=None):
+    argparse.ArgumentParser(description="Build the hashed, precompressed static assets.").parse_args(argv)
+    built, report = build()
+    for name, sizes in report.items():
+        print(f"{built[name]:32} " + "  ".join(f"{k} {v:>5} B" for k, v in sizes.items()))
+
+
+if __name__ == "__main__":
+    main()
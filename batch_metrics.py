@@ -0,0 +1,141 @@
+import argparse
+import numpy as np
+
+from core import metrics
+
+# Vectorized versions of the health calculators in core/metrics.py, for scoring whole
+# cohorts at once. Rounding and zero-guards mirror the scalar helpers exactly.
+# Missing (NaN) inputs give a NaN BMI and PI and an empty BMI category.
+
+BMI_CATEGORIES = np.array(["Underweight", "Healthy Weight", "Overweight", "Obese", ""], dtype=object)
+INPUT_COLUMNS = ("weight", "height", "age", "waist", "gender")
+METRIC_COLUMNS = ("bmi", "bmi_category", "bsa", "pi", "bmr", "ibw", "whtr")
+DEFAULTS = {"age": 0, "waist": 0, "gender": "Female"}
+
+
+# --- Rounding ---
+def _round(x, ndigits, scalar, *args):
+    # np.round scales by 10**ndigits before rounding, and numpy's vectorized
+    # power can differ from libm's pow by an ulp, so a row sitting right at a
+    # .5 boundary can round the other way from core.metrics. Those rows (within
+    # a few ulps of .5, relative to the value, or too large to have a fraction)
+    # are rare, so they are recomputed with the scalar helper to stay
+    # bit-for-bit equal.
+    scale = 10.0 ** ndigits
+    scaled = x * scale
+    out = np.rint(scaled) / scale
+    edge = np.isfinite(scaled) & (np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) <= 16 * np.spacing(np.abs(scaled)))
+    if edge.any():
+        rows = zip(*(np.broadcast_to(a, x.shape)[edge].tolist() for a in args))
+        out[edge] = [scalar(*row) for row in rows]
+    return out
+
+
+def _as_float(values):
+    return np.asarray(values, dtype=np.float64)
+
+
+# --- Vectorized Health Calculations ---
+def calculate_bmi(w, h):
+    w, h = _as_float(w), _as_float(h)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bmi = _round(w / ((h / 100) ** 2), 1, metrics.calculate_bmi, w, h)
+    # A missing (NaN) weight or height gives NaN, not the 0.0 of a zero height.
+    return np.where(h > 0, bmi, np.where(h <= 0, 0.0, np.nan))
+
+
+def classify_bmi(bmi):
+    # "" where the BMI is missing (NaN), rather than falling through to "Obese".
+    bmi = _as_float(bmi)
+    idx = np.select(
+        [bmi < 18.5, (bmi >= 18.5) & (bmi <= 24.9), (bmi >= 25.0) & (bmi <= 29.9), np.isfinite(bmi)],
+        [0, 1, 2, 3], default=4,
+    )
+    return BMI_CATEGORIES[idx]
+
+
+def calculate_bsa(w, h):
+    w, h = _as_float(w), _as_float(h)
+    ok = (w > 0) & (h > 0)
+    with np.errstate(invalid="ignore"):
+        bsa = _round(0.007184 * (w ** 0.425) * (h ** 0.725), 2, metrics.calculate_bsa, w, h)
+    return np.where(ok, bsa, 0.0)
+
+
+def calculate_pi(w, h):
+    w, h = _as_float(w), _as_float(h)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pi = _round(w / ((h / 100) ** 3), 1, metrics.calculate_pi, w, h)
+    return np.where(h > 0, pi, np.where(h <= 0, 0.0, np.nan))
+
+
+def calculate_bmr(w, h, age, gender):
+    w, h, age = _as_float(w), _as_float(h), _as_float(age)
+    male = np.asarray(gender, dtype=object) == "Male"
+    bmr = np.rint(10 * w + 6.25 * h - 5 * age + np.where(male, 5, -161))
+    return np.where((w > 0) & (h > 0) & (age > 0), bmr, 0).astype(np.int64)
+
+
+def calculate_ibw(h, gender):
+    h_inches = _as_float(h) * 0.393701
+    male = np.asarray(gender, dtype=object) == "Male"
+    ibw = np.where(male, np.rint(52 + 1.9 * (h_inches - 60)), np.rint(49 + 1.7 * (h_inches - 60)))
+    return np.where(h_inches > 60, ibw, 0).astype(np.int64)  # also 0 for a missing height
+
+
+def calculate_whtr(waist, h):
+    waist, h = _as_float(waist), _as_float(h)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        whtr = _round(waist / h, 2, metrics.calculate_whtr, waist, h)
+    return np.where((waist > 0) & (h > 0), whtr, 0.0)
+
+
+def score(weight, height, age, waist, gender):
+    bmi = calculate_bmi(weight, height)
+    return {
+        "bmi": bmi, "bmi_category": classify_bmi(bmi),
+        "bsa": calculate_bsa(weight, height),
+        "pi": calculate_pi(weight, height),
+        "bmr": calculate_bmr(weight, height, age, gender),
+        "ibw": calculate_ibw(height, gender),
+        "whtr": calculate_whtr(waist, height),
+    }
+
+
+def score_table(table):
+    # Accepts any column mapping (dict of arrays, pandas DataFrame, ...).
+    n = len(table["weight"])
+    cols = {c: table[c] if c in table else np.full(n, DEFAULTS[c], dtype=object) for c in INPUT_COLUMNS}
+    return score(cols["weight"], cols["height"], cols["age"], cols["waist"], cols["gender"])
+
+
+# --- CLI: Stream a CSV Through the Scorer ---
+def score_csv(src, dst, chunksize=100_000):
+    import pandas as pd
+    rows = 0
+    # Read as text so the input columns are written back exactly as read (a chunk
+    # with a gap would otherwise turn 30 into 30.0); numbers are parsed, and gaps
+    # filled with DEFAULTS, only for scoring.
+    for i, chunk in enumerate(pd.read_csv(src, chunksize=chunksize, dtype=str, keep_default_na=False)):
+        inputs = {c: pd.to_numeric(chunk[c], errors="coerce") for c in INPUT_COLUMNS[:4] if c in chunk}
+        if "gender" in chunk: inputs["gender"] = chunk["gender"].replace("", np.nan)
+        inputs.update({c: inputs[c].fillna(d) for c, d in DEFAULTS.items() if c in inputs})
+        for col, values in score_table(inputs).items():
+            chunk[col] = values
+        chunk.to_csv(dst, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        rows += len(chunk)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a cohort CSV with every health metric.")
+    parser.add_argument("input", help="CSV with weight and height columns (age, waist, gender optional)")
+    parser.add_argument("output", help="where to write the scored CSV")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="rows held in memory at once")
+    args = parser.parse_args(argv)
+    rows = score_csv(args.input, args.output, args.chunksize)
+    print(f"Scored {rows} rows -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
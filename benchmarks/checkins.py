@@ -0,0 +1,85 @@
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+import common
+import checkins
+
+# Load test for the check-in store: many writer threads per process, several
+# processes sharing one database file (as separate Streamlit workers would),
+# with readers polling the "last 20 days" view throughout. Reports how long
+# record() blocks the caller, read latency under load, and committed rows/s.
+
+
+def _process(task):
+    path, proc, writers, checkins_per_writer = task
+    store = checkins.CheckinStore(path)
+    record_lat, read_lat = [], []
+    lock = threading.Lock()
+    today = date.today()
+
+    def writer(w):
+        user, local = f"p{proc}-w{w}", []
+        for i in range(checkins_per_writer):
+            start = time.perf_counter()
+            store.record(user, today - timedelta(days=i % 365), 60 + i % 10, 80, movement=i % 2, hydration=True)
+            local.append(time.perf_counter() - start)
+            if i % 10 == 0:
+                start = time.perf_counter()
+                store.last_days(user, 20, today)
+                with lock: read_lat.append(time.perf_counter() - start)
+        with lock: record_lat.extend(local)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=writer, args=(w,)) for w in range(writers)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    enqueued = time.perf_counter() - start
+    store.flush()
+    return record_lat, read_lat, enqueued, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the SQLite check-in store.")
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--writers", type=int, default=200, help="writer threads per process")
+    parser.add_argument("--checkins", type=int, default=200, help="check-ins recorded by each writer")
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "checkins.db")
+        checkins.CheckinStore(path)  # create the schema before the workers race for it
+        tasks = [(path, p, args.writers, args.checkins) for p in range(args.processes)]
+        start = time.perf_counter()
+        with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+            outcomes = pool.map(_process, tasks)
+        wall = time.perf_counter() - start
+        rows = sqlite3.connect(path).execute("SELECT COUNT(*) FROM checkins").fetchone()[0]
+
+    expected = args.processes * args.writers * min(args.checkins, 365)
+    total = args.processes * args.writers * args.checkins
+    results = {
+        "processes": args.processes, "writers_per_process": args.writers, "checkins": total,
+        "rows": rows, "rows_expected": expected,
+        "record_latency_s": common.percentiles([s for rec, _, _, _ in outcomes for s in rec]),
+        "read_latency_s": common.percentiles([s for _, rd, _, _ in outcomes for s in rd]),
+        "committed_per_s": total / max(done for _, _, _, done in outcomes),
+        "wall_s": wall,
+    }
+    rec, rd = results["record_latency_s"], results["read_latency_s"]
+    print(f"{args.processes} processes x {args.writers} writers, {total} check-ins, {rows}/{expected} rows stored")
+    print(f"record():     p50 {rec['p50'] * 1e6:.0f} us  p99 {rec['p99'] * 1e6:.0f} us")
+    print(f"last_days():  p50 {rd['p50'] * 1e3:.2f} ms  p99 {rd['p99'] * 1e3:.2f} ms")
+    print(f"committed:    {results['committed_per_s']:.0f} check-ins/s")
+    if rows != expected: raise SystemExit("row count mismatch: check-ins were lost")
+    common.save(args.out, "checkins", results)
+
+
+if __name__ == "__main__":
+    main()
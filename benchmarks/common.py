@@ -0,0 +1,44 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+# Shared helpers for the benchmark scripts: repo import path, percentile
+# summaries and JSON result files that compare.py can diff between commits.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+os.environ.setdefault("FITNESS_SPINNER_DELAY", "0")
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    if not ordered: return {"count": 0}
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"count": len(ordered), "mean": sum(ordered) / len(ordered), "p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+def max_rss_bytes():
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def save(path, benchmark, results):
+    if not path: return
+    with open(path, "w") as f:
+        json.dump({"benchmark": benchmark, "meta": metadata(), "results": results}, f, indent=2)
+        f.write("\n")
+    print(f"results -> {path}")
@@ -0,0 +1,37 @@
+import argparse
+import json
+
+# Diff two benchmark result files (e.g. from two commits) metric by metric.
+
+
+def _flatten(value, prefix=""):
+    if isinstance(value, dict):
+        for k, v in value.items():
+            yield from _flatten(v, f"{prefix}.{k}" if prefix else str(k))
+    elif isinstance(value, list):
+        for i, v in enumerate(value):
+            label = v.get("concurrency", i) if isinstance(v, dict) else i
+            yield from _flatten(v, f"{prefix}[{label}]")
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield prefix, value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark JSON result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.0, help="only show changes larger than this many percent")
+    args = parser.parse_args(argv)
+    with open(args.baseline) as f: old = json.load(f)
+    with open(args.candidate) as f: new = json.load(f)
+    print(f"{old['meta'].get('commit') or args.baseline} -> {new['meta'].get('commit') or args.candidate}")
+    before = dict(_flatten(old["results"]))
+    for key, value in _flatten(new["results"]):
+        if key not in before: continue
+        change = (value - before[key]) / before[key] * 100 if before[key] else 0.0
+        if abs(change) >= args.threshold:
+            print(f"{key:60} {before[key]:>14.6g} {value:>14.6g} {change:+8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import threading
+import time
+
+import common
+import exports
+import perf
+from fragments import to_step2
+
+# Rerun latency at step 2 with the export pool idle, then with it kept saturated
+# by unique export requests. Exports run in low-priority worker processes, so
+# the two rerun distributions should match. Also reports what one export would
+# add to a rerun if it were rendered inline, and export throughput.
+
+
+def _rerun_times(at, reruns):
+    samples = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _saturate(service, stop, submitted):
+    i = 0
+    while not stop.is_set():
+        user = {"name": "Priya Sharma", "weight": 50 + (i % 1000) * 0.1, "height": 165.0, "age": 30 + i // 1000,
+                "gender": "Female", "diet": "Vegetarian", "living_situation": "I live with family"}
+        if service.submit(user) is None:
+            time.sleep(0.05)
+        else:
+            submitted.append(i)
+            i += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark rerun latency while plan exports run.")
+    parser.add_argument("--reruns", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=2, help="export worker processes")
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    user = {"name": "Priya Sharma", "weight": 72.5, "height": 165.0, "age": 31, "gender": "Female",
+            "diet": "Vegetarian", "living_situation": "I live with family"}
+    with perf.span("bench.inline_export"):
+        for _ in range(20): exports.render(user, "html")
+    inline = perf.snapshot()["spans"]["bench.inline_export"]["sum"] / 20
+
+    service = exports.Exporter(args.workers)
+    service.submit(user)  # start the workers before measuring
+    while service.pending(): time.sleep(0.05)
+
+    at = to_step2()
+    _rerun_times(at, 10)
+    idle = _rerun_times(at, args.reruns)
+
+    stop, submitted = threading.Event(), []
+    feeder = threading.Thread(target=_saturate, args=(service, stop, submitted), daemon=True)
+    feeder.start()
+    time.sleep(1.0)
+    done_before = len(submitted) - service.pending()
+    start = time.perf_counter()
+    busy = _rerun_times(at, args.reruns)
+    elapsed = time.perf_counter() - start
+    done = len(submitted) - service.pending() - done_before
+    stop.set()
+    feeder.join()
+    service.shutdown()
+
+    results = {
+        "workers": args.workers, "reruns": args.reruns, "cpus": common.metadata()["cpus"],
+        "inline_export_s": inline,
+        "rerun_idle_s": common.percentiles(idle), "rerun_during_exports_s": common.percentiles(busy),
+        "exports_per_s": done / elapsed,
+    }
+    i, b = results["rerun_idle_s"], results["rerun_during_exports_s"]
+    print(f"one export rendered inline would add {inline * 1e3:.1f} ms to a rerun")
+    print(f"rerun, pool idle:        p50 {i['p50'] * 1e3:.1f} ms  p95 {i['p95'] * 1e3:.1f} ms")
+    print(f"rerun, pool saturated:   p50 {b['p50'] * 1e3:.1f} ms  p95 {b['p95'] * 1e3:.1f} ms  ({results['exports_per_s']:.1f} exports/s)")
+    common.save(args.out, "exports", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import argparse
+
+import common
+import perf
+from streamlit.testing.v1 import AppTest
+
+# Server time of a reminders-toggle click: before step 2 was split into
+# fragments every click reran the whole script; now it reruns only the
+# reminders fragment. AppTest always reruns the full script, so the "after"
+# number is read from the fragment's own perf span. The "before" number is a
+# lower bound: it includes AppTest overhead but only the open tab is rendered.
+
+
+def to_step2():
+    at = AppTest.from_file(f"{common.ROOT}/App.py", default_timeout=30).run()
+    at.text_input[0].input("Priya Sharma")
+    at.button[0].click().run()
+    at.button[0].click().run()
+    return at
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark a step-2 reminders toggle click.")
+    parser.add_argument("--clicks", type=int, default=200)
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    at = to_step2()
+    for i in range(args.clicks):
+        before = perf._spans["fragment.reminders"].count
+        with perf.span("bench.full_rerun"):
+            at.toggle[0].set_value(i % 2 == 0).run()
+        assert perf._spans["fragment.reminders"].count == before + 1
+    snap = perf.snapshot()["spans"]
+    full, frag = snap["bench.full_rerun"], snap["fragment.reminders"]
+    print(f"toggle clicks:              {args.clicks}")
+    print(f"full script rerun (before): p50 {full['p50'] * 1e3:.2f} ms  p95 {full['p95'] * 1e3:.2f} ms")
+    print(f"reminders fragment (after): p50 {frag['p50'] * 1e3:.3f} ms  p95 {frag['p95'] * 1e3:.3f} ms")
+    print(f"server time saved per click: {full['p50'] / max(frag['p50'], 1e-9):.0f}x (p50)")
+    common.save(args.out, "fragments", {"clicks": args.clicks, "full_rerun_s": full, "reminders_fragment_s": frag})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import multiprocessing
+import time
+
+import common
+
+# Drives simulated sessions through the whole app flow with Streamlit's AppTest:
+# first load, step 0 (form submit), step 1 (preview), step 2 (full plan) and the reminders
+# toggle. AppTest patches a process-global runtime and can't run sessions
+# concurrently in one process, so concurrency is a pool of worker processes,
+# each keeping its finished sessions alive so the server-side state builds up
+# the way it does under real traffic.
+
+STEPS = ("load", "submit", "preview", "plan", "toggle")
+GENDERS = ("Female", "Male", "Prefer not to say / Other")
+
+
+def _timed(latencies, step, element):
+    start = time.perf_counter()
+    at = element.run()
+    latencies[step].append(time.perf_counter() - start)
+    return at
+
+
+def _worker(task):
+    worker_id, sessions = task
+    from streamlit.testing.v1 import AppTest
+    latencies = {step: [] for step in STEPS}
+    alive = []
+    start = time.perf_counter()
+    for i in range(sessions):
+        at = _timed(latencies, "load", AppTest.from_file(f"{common.ROOT}/App.py", default_timeout=60))
+        at.text_input[0].input(f"User {worker_id}-{i}")
+        at.selectbox[0].select(GENDERS[i % 3])
+        at.number_input[0].set_value(50.0 + (i * 7) % 80)
+        _timed(latencies, "submit", at.button[0].click())
+        _timed(latencies, "preview", at)
+        _timed(latencies, "plan", at.button[0].click())
+        _timed(latencies, "toggle", at.toggle[0].set_value(True))
+        if at.exception: raise RuntimeError(at.exception[0].message)
+        alive.append(at)
+    return latencies, time.perf_counter() - start, common.max_rss_bytes()
+
+
+def run_level(concurrency, sessions):
+    ctx = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    with ctx.Pool(concurrency) as pool:
+        outcomes = pool.map(_worker, [(w, sessions) for w in range(concurrency)])
+    wall = time.perf_counter() - start
+    merged = {step: [s for lat, _, _ in outcomes for s in lat[step]] for step in STEPS}
+    busy = max(elapsed for _, elapsed, _ in outcomes)
+    return {
+        "concurrency": concurrency,
+        "sessions": concurrency * sessions,
+        "throughput_sessions_per_s": concurrency * sessions / busy,
+        "wall_s": wall,
+        "peak_rss_bytes": max(rss for _, _, rss in outcomes),
+        "rerun_latency_s": {step: common.percentiles(samples) for step, samples in merged.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the app flow with headless AppTest sessions.")
+    parser.add_argument("--concurrency", default="1,2,4", help="comma-separated worker-process counts")
+    parser.add_argument("--sessions", type=int, default=25, help="sessions driven by each worker")
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args(argv)
+    results = []
+    for c in (int(x) for x in args.concurrency.split(",")):
+        r = run_level(c, args.sessions)
+        results.append(r)
+        lat = r["rerun_latency_s"]
+        print(f"concurrency {c:>3}: {r['throughput_sessions_per_s']:7.1f} sessions/s  peak RSS {r['peak_rss_bytes'] / 2**20:6.0f} MiB  "
+              + "  ".join(f"{s} p50/p95 {lat[s]['p50'] * 1e3:.1f}/{lat[s]['p95'] * 1e3:.1f} ms" for s in STEPS))
+    common.save(args.out, "load", results)
+
+
+if __name__ == "__main__":
+    main()
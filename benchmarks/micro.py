@@ -0,0 +1,101 @@
+import argparse
+import timeit
+from datetime import date
+
+import common  # noqa: F401  (sets up the import path)
+import assets
+import batch_metrics
+import plan_cache
+import population
+from core import chart, hooks, meals, projection
+from core.content import (
+    get_20_day_plan, get_day_on_a_plate, get_diet_recommendations, get_gender_specific_tips,
+    get_habit_and_confidence_tips, get_stress_management_tips, get_workout_recommendations,
+)
+from core.metrics import (
+    calculate_bmi, calculate_bmr, calculate_bsa, calculate_ibw, calculate_pi, calculate_whtr, classify_bmi,
+)
+
+# Per-call cost of every calculator and content generator. The plan sections
+# are timed both directly and through the shared plan_cache, as step 2 uses them.
+
+hooks.configure(img_tag=assets.img_tag)
+
+# Five years of daily check-ins for the progress chart.
+HISTORY_DAYS = list(range(5 * 365))
+HISTORY_WEIGHTS = [80.0 - d * 0.005 + (d * 7919 % 13) / 13 for d in HISTORY_DAYS]
+
+CASES = {
+    "calculate_bmi": lambda: calculate_bmi(72.5, 168.0),
+    "classify_bmi": lambda: classify_bmi(25.7),
+    "calculate_bsa": lambda: calculate_bsa(72.5, 168.0),
+    "calculate_pi": lambda: calculate_pi(72.5, 168.0),
+    "calculate_bmr": lambda: calculate_bmr(72.5, 168.0, 31, "Female"),
+    "calculate_ibw": lambda: calculate_ibw(168.0, "Male"),
+    "calculate_whtr": lambda: calculate_whtr(84, 168.0),
+    "get_20_day_plan": lambda: get_20_day_plan("Priya", "Overweight", 72.5),
+    "get_diet_recommendations": lambda: get_diet_recommendations("Overweight", "Vegetarian", "I live in a PG/Hostel", "Priya"),
+    "get_workout_recommendations": lambda: get_workout_recommendations("Overweight", "Priya"),
+    "get_habit_and_confidence_tips": lambda: get_habit_and_confidence_tips("Priya"),
+    "get_gender_specific_tips": lambda: get_gender_specific_tips("Female", "Priya"),
+    "get_stress_management_tips": lambda: get_stress_management_tips("Priya"),
+    "cached:get_diet_recommendations": lambda: plan_cache.render(get_diet_recommendations, "Overweight", "Vegetarian", "I live in a PG/Hostel", name="Priya"),
+    "cached:diet tab": lambda: plan_cache.render(get_diet_recommendations, "Overweight", "Vegetarian", "I live in a PG/Hostel", name="Priya")
+    + get_day_on_a_plate("Overweight", "Vegetarian", "I live in a PG/Hostel", 72.5, 168.0, 31, "Female"),
+    "cached:get_workout_recommendations": lambda: plan_cache.render(get_workout_recommendations, "Overweight", name="Priya"),
+    "cached:get_habit_and_confidence_tips": lambda: plan_cache.render(get_habit_and_confidence_tips, name="Priya"),
+    "cached:get_gender_specific_tips": lambda: plan_cache.render(get_gender_specific_tips, "Female", name="Priya"),
+    "cached:get_stress_management_tips": lambda: plan_cache.render(get_stress_management_tips, name="Priya"),
+    "cached:projection.project(365d)": lambda: projection.project(72.5, 168.0, 31, "Female", "Overweight", 365),
+    "meals.plan": lambda: (meals.plan.cache_clear(), meals.plan(72.5, 168.0, 31, "Female", "Overweight", "Non-Vegetarian", "I live with family")),
+    "chart.lttb(5y daily)": lambda: chart.lttb(HISTORY_DAYS, HISTORY_WEIGHTS),
+    "chart.progress_chart(5y daily)": lambda: chart.progress_chart(date(2021, 1, 1), HISTORY_DAYS, HISTORY_WEIGHTS, 168.0, 31, "Female", "Overweight"),
+    "projection.Trajectory.update(365d)": lambda: projection.Trajectory(72.5, 168.0, 31, "Female", "Overweight", 365).update(180, 70.0),
+}
+
+
+def run(number, repeat):
+    results = {}
+    for name, fn in CASES.items():
+        timer = timeit.Timer(fn)
+        # Without --number, each case gets enough calls for about 0.2 s per run,
+        # so the millisecond-scale chart and meal-plan cases don't take minutes.
+        calls = number or timer.autorange()[0]
+        best = min(timer.repeat(number=calls, repeat=repeat))
+        results[name] = {"ns_per_call": best / calls * 1e9, "number": calls}
+    rows = 100_000
+    args = ([72.5] * rows, [168.0] * rows, [31] * rows, [84] * rows, ["Female"] * rows)
+    best = min(timeit.repeat(lambda: batch_metrics.score(*args), number=1, repeat=repeat))
+    results["batch_metrics.score"] = {"ns_per_call": best / rows * 1e9, "rows": rows}
+    users = 10_000
+    cohort = ([72.5] * users, [168.0] * users, [31] * users, ["Female"] * users, ["Overweight"] * users, 365)
+    best = min(timeit.repeat(lambda: projection.project_many(*cohort), number=1, repeat=repeat))
+    results["projection.project_many(365d)"] = {"ns_per_call": best / users * 1e9, "users": users}
+    # About 50 us a row, so a smaller table keeps this case to a fraction of a second per run.
+    table = {"weight": args[0][:users], "height": args[1][:users], "age": args[2][:users], "gender": args[4][:users],
+             "diet": ["Non-Vegetarian"] * users, "living_situation": ["I live with family"] * users}
+    best = min(timeit.repeat(lambda: meals.plan_table(table), number=1, repeat=repeat))
+    results["meals.plan_table"] = {"ns_per_call": best / users * 1e9, "rows": users}
+    table = {"weight": args[0], "height": args[1], "waist": args[3], "gender": args[4], "diet": ["Vegetarian"] * rows}
+    sketch = population.PopulationSketch()
+    best = min(timeit.repeat(lambda: sketch.update(table), number=1, repeat=repeat))
+    results["population.PopulationSketch.update"] = {"ns_per_call": best / rows * 1e9, "rows": rows}
+    best = min(timeit.repeat(lambda: (sketch.category_shares("India", gender="Female"), sketch.percentiles("whtr")), number=1000, repeat=repeat))
+    results["population.shares+percentiles"] = {"ns_per_call": best / 1000 * 1e9}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmark the calculators and content generators.")
+    parser.add_argument("--number", type=int, default=None, help="calls per timing run (default: picked per case with timeit's autorange)")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs; the best is kept")
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args(argv)
+    results = run(args.number, args.repeat)
+    for name, r in results.items():
+        print(f"{name:40} {r['ns_per_call']:>10.0f} ns/call")
+    common.save(args.out, "micro", results)
+
+
+if __name__ == "__main__":
+    main()
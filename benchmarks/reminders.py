@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import random
+import time
+
+import common
+import reminders
+
+# Scheduling overhead and timer drift for the reminder scheduler. Schedules
+# --reminders one-off reminders spread over --window seconds on one event loop,
+# then runs them through a sink that records when each batch arrived. With
+# --sink-delay the sink is slowed down per batch, so backpressure shows up as
+# extra lag instead of unbounded queueing.
+
+KINDS = {"nudge": (365 * 24 * reminders.HOUR, "Hey {name}, stay hydrated! 💧")}
+
+
+class TimingSink:
+    def __init__(self, delay):
+        self.delay = delay
+        self.lag = []
+        self.batches = 0
+
+    async def send(self, batch):
+        if self.delay: await asyncio.sleep(self.delay)
+        now = asyncio.get_running_loop().time()
+        self.lag.extend(now - r.due for r in batch)
+        self.batches += 1
+
+
+async def _run(count, window, batch_size, max_batches, delay):
+    sink = TimingSink(delay)
+    scheduler = reminders.Scheduler(sink, batch_size=batch_size, max_batches=max_batches, kinds=KINDS)
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(0)
+    loop = asyncio.get_running_loop()
+    start = loop.time() + 0.5
+    offsets = [random.uniform(0, window) for _ in range(count)]
+    t0 = time.perf_counter()
+    for i, offset in enumerate(offsets):
+        scheduler.add(f"user{i}", "Priya", first_due=start + offset)
+    add_s = time.perf_counter() - t0
+    pending = len(scheduler)
+    cpu0 = time.process_time()
+    while len(sink.lag) < count:
+        await asyncio.sleep(0.05)
+    cpu = time.process_time() - cpu0
+    scheduler.stop()
+    await task
+    t0 = time.perf_counter()
+    for i in range(0, count, 2):
+        scheduler.cancel(f"user{i}")
+    cancel_s = time.perf_counter() - t0
+    return {
+        "reminders": count, "pending_at_start": pending, "window_s": window, "sink_delay_s": delay,
+        "add_ns": add_s / count * 1e9, "cancel_ns": cancel_s / (count // 2) * 1e9,
+        "batches": sink.batches, "cpu_s": cpu, "cpu_per_reminder_us": cpu / count * 1e6,
+        "lag_s": common.percentiles(sink.lag),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the reminder scheduler.")
+    parser.add_argument("--reminders", type=int, default=100_000)
+    parser.add_argument("--window", type=float, default=10.0, help="seconds the due times are spread over")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--max-batches", type=int, default=8, help="batches queued before the scheduler waits")
+    parser.add_argument("--sink-delay", type=float, default=0.0, help="seconds each sink batch takes")
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args(argv)
+    results = asyncio.run(_run(args.reminders, args.window, args.batch_size, args.max_batches, args.sink_delay))
+    lag = results["lag_s"]
+    print(f"{results['reminders']} reminders over {args.window:g}s, sink delay {args.sink_delay * 1e3:g} ms/batch")
+    print(f"add():     {results['add_ns']:.0f} ns/reminder   cancel(): {results['cancel_ns']:.0f} ns/user")
+    print(f"drift:     p50 {lag['p50'] * 1e3:.2f} ms  p99 {lag['p99'] * 1e3:.2f} ms  mean {lag['mean'] * 1e3:.2f} ms")
+    print(f"loop cpu:  {results['cpu_s']:.2f} s ({results['cpu_per_reminder_us']:.1f} us/reminder), {results['batches']} batches")
+    common.save(args.out, "reminders", results)
+
+
+if __name__ == "__main__":
+    main()
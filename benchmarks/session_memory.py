@@ -0,0 +1,68 @@
+import argparse
+import tracemalloc
+
+import common
+import sessions
+from core.models import HealthMetrics, UserProfile
+
+# Bytes of per-session state: the old string-keyed user_data/metrics dicts,
+# slotted UserProfile/HealthMetrics objects, and the encoded records the
+# session store now holds.
+
+GENDERS = ("Female", "Male", "Prefer not to say / Other")
+CATEGORIES = ("Underweight", "Healthy Weight", "Overweight", "Obese")
+
+
+def inputs(i):
+    return (f"User {i}", 50.0 + i % 60, 150.0 + i % 40, "Vegetarian", "I live with family", GENDERS[i % 3], 20 + i % 50, 70 + i % 40)
+
+
+def outputs(i):
+    return (20.0 + i % 15 / 10, CATEGORIES[i % 4], 1.5 + i % 50 / 100, 12.0 + i % 9 / 10, 1200 + i % 600, 50 + i % 30, 0.4 + i % 30 / 100)
+
+
+def dict_sessions(n):
+    keys_in = ("name", "weight", "height", "diet", "living_situation", "gender", "age", "waist")
+    keys_out = ("bmi", "bmi_category", "bsa", "pi", "bmr", "ibw", "whtr")
+    return {f"s{i}": {"user_data": dict(zip(keys_in, inputs(i))), "metrics": dict(zip(keys_out, outputs(i)))} for i in range(n)}
+
+
+def slotted_sessions(n):
+    return {f"s{i}": (UserProfile(*inputs(i)), HealthMetrics(*outputs(i))) for i in range(n)}
+
+
+def encoded_sessions(n):
+    store = sessions.MemoryBackend()
+    for i in range(n):
+        store.put(f"s{i}", sessions.encode(sessions.Session(2, UserProfile(*inputs(i)), HealthMetrics(*outputs(i)))))
+    return store
+
+
+def measure(build, n):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = build(n)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return (after - before) / n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure bytes of state held per session.")
+    parser.add_argument("--sessions", type=int, default=50_000)
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args(argv)
+    old, new = measure(dict_sessions, args.sessions), measure(slotted_sessions, args.sessions)
+    encoded = measure(encoded_sessions, args.sessions)
+    record = len(sessions.encode(sessions.Session(2, UserProfile(*inputs(0)), HealthMetrics(*outputs(0)))))
+    print(f"sessions:                  {args.sessions}")
+    print(f"dict user_data + metrics:  {old:.0f} B/session")
+    print(f"slotted profile + metrics: {new:.0f} B/session ({100 * (1 - new / old):.0f}% less)")
+    print(f"encoded in session store:  {encoded:.0f} B/session ({100 * (1 - encoded / old):.0f}% less; {record} B record)")
+    common.save(args.out, "session_memory", {"sessions": args.sessions, "dict_bytes_per_session": old, "slotted_bytes_per_session": new,
+                                             "encoded_bytes_per_session": encoded, "record_bytes": record})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+import common
+
+# Sticky-free serving: several app processes share one SQLite session store and
+# every request goes to whichever process picks it up, as behind a round-robin
+# load balancer. Sessions are seeded at step 2; each request is a fresh AppTest
+# (a new websocket, no st.session_state) carrying only the session id in the
+# URL, so it renders the full plan only if the state came from the shared store.
+
+PLAN_HEADER = "Your Action Plan for a Healthier, More Confident You!"
+
+
+def _seed(count):
+    import sessions
+    from core.metrics import calculate_metrics
+    from core.models import UserProfile
+    sids = []
+    for i in range(count):
+        user = UserProfile(f"User {i}", 50.0 + i % 60, 150.0 + i % 40, "Vegetarian", "I live with family", "Female", 20 + i % 50, 70 + i % 40)
+        sid = f"bench{i:06d}"
+        sessions.save(sid, sessions.Session(2, user, calculate_metrics(user)))
+        sids.append(sid)
+    return sids
+
+
+def _worker(task):
+    worker_id, sids, requests = task
+    from streamlit.testing.v1 import AppTest
+    import perf
+    rng = random.Random(worker_id)
+    latencies, resumed = [], 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        at = AppTest.from_file(f"{common.ROOT}/App.py", default_timeout=60)
+        at.query_params["uid"] = rng.choice(sids)
+        begin = time.perf_counter()
+        at.run()
+        latencies.append(time.perf_counter() - begin)
+        if at.exception: raise RuntimeError(at.exception[0].message)
+        resumed += any(h.value == PLAN_HEADER for h in at.header)
+    spans = perf.snapshot()["spans"]
+    return latencies, resumed, time.perf_counter() - start, spans["session.load"]["sum"] / spans["session.load"]["count"], spans.get("session.save", {}).get("count", 0)
+
+
+def run_level(processes, sids, requests):
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(processes) as pool:
+        outcomes = pool.map(_worker, [(w, sids, requests) for w in range(processes)])
+    total = processes * requests
+    return {
+        "processes": processes, "requests": total,
+        "resumed_fraction": sum(o[1] for o in outcomes) / total,
+        "throughput_requests_per_s": total / max(o[2] for o in outcomes),
+        "rerun_latency_s": common.percentiles([s for o in outcomes for s in o[0]]),
+        "session_load_mean_s": sum(o[3] for o in outcomes) / processes,
+        "session_writes": sum(o[4] for o in outcomes),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test several app processes sharing one session store.")
+    parser.add_argument("--processes", default="1,2,4", help="comma-separated process counts")
+    parser.add_argument("--sessions", type=int, default=200, help="seeded sessions shared by all processes")
+    parser.add_argument("--requests", type=int, default=20, help="requests per process")
+    parser.add_argument("--db", help="SQLite file (default: a temporary one)")
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    db = args.db or os.path.join(tempfile.mkdtemp(), "sessions.db")
+    os.environ["FITNESS_SESSION_BACKEND"] = f"sqlite:{db}"  # inherited by the spawned processes
+    sids = _seed(args.sessions)
+
+    levels = [run_level(int(n), sids, args.requests) for n in args.processes.split(",")]
+    print(f"shared store: {db}  ({args.sessions} sessions, {common.metadata()['cpus']} cpus)")
+    for r in levels:
+        lat = r["rerun_latency_s"]
+        print(f"{r['processes']} processes: {r['throughput_requests_per_s']:.1f} req/s  p50 {lat['p50'] * 1e3:.1f} ms  p95 {lat['p95'] * 1e3:.1f} ms  "
+              f"resumed {100 * r['resumed_fraction']:.0f}%  load {r['session_load_mean_s'] * 1e6:.0f} µs  writes {r['session_writes']}")
+    common.save(args.out, "shared_sessions", {"sessions": args.sessions, "cpus": common.metadata()["cpus"], "levels": levels})
+
+
+if __name__ == "__main__":
+    main()
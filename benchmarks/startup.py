@@ -0,0 +1,55 @@
+import argparse
+import re
+import subprocess
+import sys
+import time
+
+import common
+
+# Cold-start and rerun cost. Cold imports run in fresh interpreters under
+# `python -X importtime`; `streamlit` is listed for reference, since reaching
+# the calculators used to mean importing it and running App.py. Rerun time is
+# the full App.py script under AppTest at step 0 (form) and step 2 (plan).
+
+MODULES = ("core", "core.metrics", "core.content", "batch_metrics", "reports", "streamlit")
+
+
+def cold_import_us(module, runs):
+    samples = []
+    for _ in range(runs):
+        err = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                             cwd=common.ROOT, capture_output=True, text=True, check=True).stderr
+        match = re.search(rf"^import time:\s+\d+ \|\s+(\d+) \| {re.escape(module)}$", err, re.M)
+        samples.append(int(match.group(1)))
+    return common.percentiles(samples)
+
+
+def rerun_s(reruns):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(f"{common.ROOT}/App.py", default_timeout=60).run()
+    timings = {"step0": [], "step2": []}
+    for _ in range(reruns):
+        start = time.perf_counter(); at.run(); timings["step0"].append(time.perf_counter() - start)
+    at.text_input[0].input("Priya Sharma"); at.button[0].click().run()
+    at.button[0].click().run()
+    for _ in range(reruns):
+        start = time.perf_counter(); at.run(); timings["step2"].append(time.perf_counter() - start)
+    return {step: common.percentiles(samples) for step, samples in timings.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-import time and per-rerun script time.")
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters per module")
+    parser.add_argument("--reruns", type=int, default=50, help="AppTest reruns per step")
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args(argv)
+    results = {"cold_import_us": {m: cold_import_us(m, args.runs) for m in MODULES}, "rerun_s": rerun_s(args.reruns)}
+    for module, r in results["cold_import_us"].items():
+        print(f"import {module:16} p50 {r['p50'] / 1e3:8.1f} ms")
+    for step, r in results["rerun_s"].items():
+        print(f"rerun {step:17} p50 {r['p50'] * 1e3:8.1f} ms  p95 {r['p95'] * 1e3:.1f} ms")
+    common.save(args.out, "startup", results)
+
+
+if __name__ == "__main__":
+    main()
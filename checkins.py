@@ -0,0 +1,199 @@
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+# Persistent 20-day challenge check-ins, stored in SQLite (WAL mode). Writes are
+# queued and committed in batches by a background thread, so a rerun never
+# waits on disk; reads go through a small connection pool and also see writes
+# that are still queued. A batch that keeps failing to commit stays queued and
+# is retried with backoff (see `failing`), never dropped.
+#
+#   FITNESS_CHECKIN_DB  database file (default checkins.db next to this module)
+
+log = logging.getLogger(__name__)
+
+GOALS = ("movement", "hydration", "mindful_meal", "reflection")
+COLUMNS = ("user", "day", "weight", "waist") + GOALS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkins (
+    user TEXT NOT NULL,
+    day TEXT NOT NULL,
+    weight REAL,
+    waist REAL,
+    movement INTEGER NOT NULL DEFAULT 0,
+    hydration INTEGER NOT NULL DEFAULT 0,
+    mindful_meal INTEGER NOT NULL DEFAULT 0,
+    reflection INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (user, day)
+) WITHOUT ROWID
+"""
+
+# The (user, day) primary key is the index both statements below run against.
+UPSERT = f"""
+INSERT INTO checkins ({", ".join(COLUMNS)}, updated_at) VALUES ({", ".join("?" * (len(COLUMNS) + 1))})
+ON CONFLICT (user, day) DO UPDATE SET
+    {", ".join(f"{c} = excluded.{c}" for c in COLUMNS[2:])}, updated_at = excluded.updated_at
+"""
+LAST_DAYS = f"SELECT {', '.join(COLUMNS[1:])} FROM checkins WHERE user = ? AND day >= ? ORDER BY day"
+WEIGHTS = "SELECT day, weight FROM checkins WHERE user = ? AND weight IS NOT NULL ORDER BY day"
+VERSION = "SELECT COUNT(*), MAX(updated_at) FROM checkins WHERE user = ?"
+
+
+class CheckinStore:
+    def __init__(self, path, pool_size=4, batch_size=500, flush_interval=0.05, max_backoff=5.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.failing = False  # True while a batch is waiting to be retried
+        self._pool = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        with self._connection() as conn:
+            conn.execute(SCHEMA)
+        self._queue = queue.Queue()
+        self._pending = {}  # user -> {day: row} not yet committed, for read-your-writes
+        self._pending_lock = threading.Lock()
+        self._writer_conn = self._connect()
+        self._writer = threading.Thread(target=self._write_loop, name="checkin-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30, isolation_level=None, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    # --- Writes ---
+    def record(self, user, day, weight=None, waist=None, **goals):
+        # Returns immediately; the row is committed by the writer thread. updated_at is
+        # set here rather than at commit, so committing a row doesn't change version().
+        row = (user, day.isoformat(), weight, waist) + tuple(int(bool(goals.get(g))) for g in GOALS) + (time.time(),)
+        with self._pending_lock:
+            self._pending.setdefault(user, {})[row[1]] = row
+        self._queue.put(row)
+
+    def _write_loop(self):
+        backoff = 0.0
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            rows = [row for row in batch if row is not None]
+            if self._commit(rows):
+                backoff = 0.0
+            else:
+                # Keep the rows (still visible to reads through _pending) and try again later.
+                backoff = min(self.max_backoff, max(0.5, backoff * 2))
+                time.sleep(backoff)
+                with self._pending_lock:
+                    # A newer check-in for the same day replaces the failed one.
+                    retry = [row for row in rows if self._pending.get(row[0], {}).get(row[1]) is row]
+                for row in retry:
+                    self._queue.put(row)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _commit(self, rows, attempts=3):
+        if not rows: return True
+        conn = self._writer_conn
+        for attempt in range(attempts):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(UPSERT, rows)
+                conn.execute("COMMIT")
+                break
+            except sqlite3.Error:
+                if conn.in_transaction: conn.execute("ROLLBACK")
+                if attempt == attempts - 1:
+                    log.exception("Could not commit %d check-ins after %d attempts; will retry", len(rows), attempts)
+                    self.failing = True
+                    return False
+                time.sleep(0.1 * (attempt + 1))
+        self.failing = False
+        with self._pending_lock:
+            for row in rows:
+                days = self._pending.get(row[0])
+                if days and days.get(row[1]) is row:
+                    del days[row[1]]
+                    if not days: del self._pending[row[0]]
+        return True
+
+    def flush(self, timeout=None):
+        # Waits until everything queued so far is committed; returns False on timeout.
+        self._queue.put(None)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                log.error("%d check-ins still uncommitted after %.0fs", self._queue.unfinished_tasks, timeout)
+                return False
+            time.sleep(0.01)
+        return True
+
+    # --- Reads ---
+    def last_days(self, user, n=20, today=None):
+        since = ((today or date.today()) - timedelta(days=n - 1)).isoformat()
+        with self._connection() as conn:
+            rows = {r[0]: r for r in conn.execute(LAST_DAYS, (user, since))}
+        with self._pending_lock:
+            rows.update({day: row[1:] for day, row in self._pending.get(user, {}).items() if day >= since})
+        return [dict(zip(COLUMNS[1:], rows[day])) for day in sorted(rows)]
+
+    def weights(self, user):
+        # Every logged weight as (day, kg), oldest first.
+        with self._connection() as conn:
+            rows = dict(conn.execute(WEIGHTS, (user,)))
+        with self._pending_lock:
+            for day, row in self._pending.get(user, {}).items():
+                if row[2] is None: rows.pop(day, None)
+                else: rows[day] = row[2]
+        return sorted(rows.items())
+
+    def version(self, user):
+        # (check-ins, latest updated_at) over committed and queued rows together.
+        # Changes once per check-in, when it is recorded here or committed by
+        # another process, and not again when this process commits it.
+        with self._pending_lock:
+            pending = list(self._pending.get(user, {}).values())
+        # Taken before the query: a queued day committed in between is counted once, from `pending`.
+        days = [row[1] for row in pending]
+        with self._connection() as conn:
+            if days: count, latest = conn.execute(VERSION + f" AND day NOT IN ({', '.join('?' * len(days))})", (user, *days)).fetchone()
+            else: count, latest = conn.execute(VERSION, (user,)).fetchone()
+        if pending: latest = max([row[-1] for row in pending] + ([latest] if latest is not None else []))
+        return count + len(pending), latest
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def store():
+    # One store per process, opened on first use.
+    global _store
+    with _store_lock:
+        if _store is None:
+            path = os.environ.get("FITNESS_CHECKIN_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "checkins.db"))
+            _store = CheckinStore(path)
+            atexit.register(_store.flush, 10.0)
+        return _store
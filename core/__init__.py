@@ -0,0 +1,17 @@
+# Streamlit-free core of the app: health calculators, plan content and the
+# weight projection. It imports nothing from the app around it; banner images,
+# timing and the population sketch are handed in with configure() (core.hooks).
+# Importing it has no side effects; streamlit is imported only by
+# get_india_snapshot when called, and numpy only by core.projection, core.chart
+# and core.meals.
+from core.content import (
+    get_20_day_plan, get_day_on_a_plate, get_diet_recommendations, get_gender_specific_tips,
+    get_habit_and_confidence_tips, get_india_snapshot, get_india_snapshot_html, get_stress_management_tips,
+    get_workout_recommendations,
+)
+from core.hooks import configure
+from core.metrics import (
+    calculate_bmi, calculate_bmr, calculate_bsa, calculate_ibw, calculate_metrics, calculate_pi, calculate_whtr,
+    classify_bmi,
+)
+from core.models import HealthMetrics, UserProfile
@@ -0,0 +1,134 @@
+import base64
+from datetime import timedelta
+from functools import lru_cache
+
+import numpy as np
+
+from core import projection
+
+# Weight progress chart for the 20-day goal tab, drawn as a small SVG with no
+# plotting library or external image service. Logged weights are solid, the
+# plan (projected from the first logged weight) is dashed, and the next 20
+# days from the latest weight are dotted. Long histories are cut down with
+# largest-triangle-three-buckets, which keeps the peaks and dips a plain
+# stride would drop, so a chart never has more than MAX_POINTS per line.
+
+WIDTH, HEIGHT = 800, 240
+MAX_POINTS = 200
+HORIZON = 20
+BG, FG, GRID = "#272727", "#FFFFFF", "#444444"
+LOGGED, PLAN, AHEAD = "#00BCD4", "#FF6F00", "#8BC34A"
+LEFT, RIGHT, TOP, BOTTOM = 48, 16, 36, 28
+
+# 20-day change used when there is no age/height to project from (same as get_20_day_plan).
+FALLBACK_CHANGE = {"Overweight": -1.5, "Obese": -2.0, "Underweight": 1.0}
+
+
+# --- Downsampling ---
+def lttb(x, y, n=MAX_POINTS):
+    # Largest-triangle-three-buckets: keeps the first and last points and, from
+    # each of n - 2 equal buckets in between, the point forming the largest
+    # triangle with the previous pick and the next bucket's mean.
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    size = len(x)
+    if n < 3 or size <= n: return x, y
+    edges = np.append(np.linspace(1, size - 1, n - 1).astype(np.int64), size)
+    counts = np.diff(edges)
+    mean_x = (np.add.reduceat(x, edges[:-1]) / counts).tolist()
+    mean_y = (np.add.reduceat(y, edges[:-1]) / counts).tolist()
+    # Buckets hold a handful of points, so a plain loop beats a numpy call per bucket.
+    xs, ys, edges = x.tolist(), y.tolist(), edges.tolist()
+    picks, a = [0], 0
+    for i in range(n - 2):
+        ax, ay = xs[a], ys[a]
+        dx, dy = mean_x[i + 1] - ax, mean_y[i + 1] - ay
+        best = -1.0
+        for j in range(edges[i], edges[i + 1]):
+            area = abs(dx * (ys[j] - ay) - dy * (xs[j] - ax))  # twice the triangle area
+            if area > best: best, a = area, j
+        picks.append(a)
+    picks.append(size - 1)
+    return x[picks], y[picks]
+
+
+def thin(x, y, n=MAX_POINTS):
+    # Evenly spaced points; enough for a smooth curve like the plan.
+    if len(x) <= n: return x, y
+    picks = np.linspace(0, len(x) - 1, n).round().astype(np.int64)
+    return x[picks], y[picks]
+
+
+# --- Series ---
+def plan_line(w0, height, age, gender, category, horizon):
+    if height > 0 and age > 0:
+        return np.asarray(projection.project(float(w0), float(height), int(age), gender, category, int(horizon)))
+    target = w0 + FALLBACK_CHANGE.get(category, 0.0)
+    return np.interp(np.arange(horizon + 1), (0, HORIZON), (w0, target))
+
+
+# --- SVG ---
+def _polyline(px, py, color, dash=""):
+    points = " ".join(f"{a:.1f},{b:.1f}" for a, b in zip(px.tolist(), py.tolist()))
+    dash = f' stroke-dasharray="{dash}"' if dash else ""
+    return f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="2.5" stroke-linejoin="round"{dash}/>'
+
+
+def _text(x, y, text, anchor="start", size=12, color=FG):
+    return f'<text x="{x:.0f}" y="{y:.0f}" fill="{color}" font-family="Poppins, sans-serif" font-size="{size}" text-anchor="{anchor}">{text}</text>'
+
+
+def progress_svg(start, days, weights, height=0, age=0, gender="Female", category="Healthy Weight", fallback_weight=None):
+    # days: offsets from `start` (a date) of each logged weight, ascending. With no
+    # logs the plan starts from fallback_weight on `start`.
+    days, weights = np.asarray(days, dtype=np.float64), np.asarray(weights, dtype=np.float64)
+    last_day = days[-1] if len(days) else 0.0
+    w0 = weights[0] if len(weights) else fallback_weight
+    span = int(last_day) + HORIZON
+    plan_x = np.arange(span + 1, dtype=np.float64)
+    lines = [(*thin(plan_x, plan_line(w0, height, age, gender, category, span)), PLAN, "8 6", "Plan")]
+    if len(days):
+        ahead_x = last_day + np.arange(HORIZON + 1)
+        lines.insert(0, (ahead_x, plan_line(weights[-1], height, age, gender, category, HORIZON), AHEAD, "2 5", "Next 20 days"))
+        lines.append((*lttb(days, weights), LOGGED, "", "Logged"))
+
+    lo = min(float(line[1].min()) for line in lines)
+    hi = max(float(line[1].max()) for line in lines)
+    pad = max(0.5, (hi - lo) * 0.1)
+    lo, hi = lo - pad, hi + pad
+    plot_w, plot_h = WIDTH - LEFT - RIGHT, HEIGHT - TOP - BOTTOM
+    to_px = lambda x: LEFT + x * plot_w / span
+    to_py = lambda y: TOP + (hi - y) * plot_h / (hi - lo)
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{HEIGHT}" viewBox="0 0 {WIDTH} {HEIGHT}">',
+             f'<rect width="100%" height="100%" rx="10" fill="{BG}"/>',
+             _text(LEFT, 22, f"Your Journey: {start.strftime('%b %d, %Y')} to {(start + timedelta(days=span)).strftime('%b %d, %Y')}", size=14)]
+    for frac in (0.0, 0.5, 1.0):
+        y = TOP + frac * plot_h
+        parts.append(f'<line x1="{LEFT}" y1="{y:.1f}" x2="{WIDTH - RIGHT}" y2="{y:.1f}" stroke="{GRID}"/>')
+        parts.append(_text(LEFT - 6, y + 4, f"{hi - frac * (hi - lo):.1f}", "end", 11))
+    parts.append(_text(LEFT, HEIGHT - 8, start.strftime("%b %d"), size=11))
+    parts.append(_text(WIDTH - RIGHT, HEIGHT - 8, (start + timedelta(days=span)).strftime("%b %d"), "end", 11))
+    legend_x = WIDTH - RIGHT
+    for lx, ly, color, dash, label in lines:
+        parts.append(_polyline(to_px(lx), to_py(ly), color, dash))
+        parts.append(_text(legend_x, 22, label, "end", 12, color))
+        legend_x -= 12 + 7 * len(label)
+    if len(days):
+        parts.append(f'<circle cx="{to_px(last_day):.1f}" cy="{to_py(weights[-1]):.1f}" r="4" fill="{LOGGED}"/>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def img_tag(svg, style="border-radius: 10px; margin-bottom: 20px; width: 100%;"):
+    # Inline data URI, so the chart also works in downloaded and headless reports.
+    return f"<img src='data:image/svg+xml;base64,{base64.b64encode(svg.encode()).decode()}' style='{style}'>"
+
+
+@lru_cache(maxsize=1024)
+def projection_chart(weight, height, age, gender, category, today):
+    # The chart before any check-ins: just the plan from today's weight.
+    return img_tag(progress_svg(today, (), (), height, age, gender, category, fallback_weight=weight))
+
+
+def progress_chart(start, days, weights, height, age, gender, category):
+    return img_tag(progress_svg(start, days, weights, height, age, gender, category))
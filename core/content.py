@@ -0,0 +1,313 @@
+from datetime import date, timedelta
+from functools import lru_cache
+
+from core import hooks
+
+
+# --- Content Generation Functions ---
+@hooks.timed
+def get_diet_recommendations(category, diet_type, living_situation, name, weight=0, height=0, age=0, gender="Female"):
+    title = f"<h3>🥗 Hey {name}, I hope you're having a great day! Let's talk food.</h3>"
+    content = hooks.img_tag("thali.svg")
+    
+    base_info = f"""
+    <div class="custom-box">
+    <p>Based on your <b>{category}</b> status, here are some simple, balanced meal ideas that fit your <b>{diet_type}</b> preference. Think of this as a friendly guide, not a strict rulebook. The goal is to build a healthy relationship with food!</p>
+    <h4>🌟 Golden Rules of Mindful Eating:</h4>
+    <ul>
+        <li><b>Stay Hydrated:</b> Aim for 2-3 litres of water daily. It's the simplest and most effective habit!</li>
+        <li><b>Portion Smarts:</b> Use a smaller plate. When eating a thali, fill half your plate with vegetables/salad, a quarter with dal/protein, and a quarter with rice/roti.</li>
+        <li><b>Eat Slowly:</b> Savor each bite. It takes 20 minutes for your brain to register fullness.</li>
+        <li><b>Smart Snacking:</b> For mid-meal hunger, grab a fruit, a handful of chana, or a bowl of dahi.</li>
+    </ul>
+    </div>
+    """
+    
+    specific_advice = ""
+    if category in ["Overweight", "Obese"]:
+        specific_advice = """
+        <h4>🎯 Your Focus: Nutrient-Dense Foods</h4>
+        <p>We want foods that are high in nutrients but moderate in calories.</p>
+        """
+        if diet_type == "Vegetarian":
+            specific_advice += "<ul><li><b>Breakfast:</b> Oats upma, moong dal chilla, or poha with lots of veggies.</li><li><b>Lunch:</b> 2 multigrain rotis, a large bowl of dal, sabzi, and a big salad.</li><li><b>Dinner:</b> Keep it light! Vegetable khichdi, paneer bhurji, or a large bowl of lentil soup (dal).</li></ul>"
+        elif diet_type == "Eggetarian":
+            specific_advice += "<ul><li><b>Breakfast:</b> 2 boiled eggs or a simple egg bhurji with less oil.</li><li><b>Lunch:</b> Add boiled eggs to your veg thali for a protein boost.</li><li><b>Dinner:</b> A simple egg curry with 1-2 rotis.</li></ul>"
+        else:  # Non-Vegetarian
+            specific_advice += "<ul><li><b>Breakfast:</b> Egg bhurji or 2 boiled eggs.</li><li><b>Lunch:</b> 100g grilled chicken/fish with a large salad and a small portion of brown rice or one roti.</li><li><b>Dinner:</b> Homestyle chicken/fish curry (thin gravy) with lots of veggies.</li></ul>"
+
+    elif category == "Underweight":
+        specific_advice = """
+        <h4>🎯 Your Focus: Healthy & Sustainable Weight Gain</h4>
+        <p>Our goal is to nourish your body with calorie-dense and nutrient-rich foods to build strength and stamina in a healthy way.</p>
+        """
+        if diet_type == "Vegetarian":
+            specific_advice += """
+            <ul>
+                <li><b>Breakfast:</b> A bowl of dalia or oats cooked in milk with nuts and seeds. Or, 2 paneer-stuffed parathas with dahi.</li>
+                <li><b>Lunch:</b> A full thali with 2 rotis (with ghee), a generous serving of rice, dal, sabzi, and a side of paneer or tofu curry.</li>
+                <li><b>Dinner:</b> Khichdi made with extra ghee, or rajma/chana masala with rice. A glass of warm milk before bed is a great addition.</li>
+                <li><b>Snacks:</b> Peanut butter with apple slices, a handful of almonds/walnuts, or a banana shake.</li>
+            </ul>
+            """
+        elif diet_type == "Eggetarian":
+            specific_advice += """
+            <ul>
+                <li><b>Breakfast:</b> A 3-egg omelette with cheese and vegetables, served with 2 slices of whole wheat toast.</li>
+                <li><b>Lunch:</b> Add 2-3 boiled eggs to your standard vegetarian thali for an easy protein and calorie boost.</li>
+                <li><b>Dinner:</b> Egg curry with rice or roti, along with a hearty sabzi.</li>
+            </ul>
+            """
+        else:  # Non-Vegetarian
+            specific_advice += """
+            <ul>
+                <li><b>Breakfast:</b> 3-egg omelette or scrambled eggs with chicken sausages.</li>
+                <li><b>Lunch:</b> A generous portion of chicken or fish curry with rice, dal, and sabzi. Don't skip the carbs!</li>
+                <li><b>Dinner:</b> Grilled chicken/fish (150g) with roasted sweet potatoes and vegetables.</li>
+            </ul>
+            """
+    
+    else: # Healthy Weight
+        specific_advice = "<h4>🎯 Your Focus: Maintenance & Vitality</h4><p>You're doing great! Let's focus on maintaining this balance with variety and whole foods.</p><ul><li>Ensure a good mix of protein (dal, paneer, eggs, chicken), complex carbs (roti, brown rice), and colorful vegetables.</li></ul>"
+
+    living_advice = ""
+    if living_situation == "I cook for myself":
+        living_advice = "<h4>💡 Tip for You:</h4><p>One-pot meals are your best friend! Think vegetable pulao, dal khichdi, or a quick paneer/chicken stir-fry. Easy, quick, and nutritious.</p>"
+    elif living_situation == "I live in a PG/Hostel":
+        living_advice = "<h4>💡 Making Smart Choices in the Mess:</h4><p>You can still eat healthy!<ul><li>Always take the salad if it's available.</li><li>Ask for an extra serving of dal and sabzi instead of a second helping of rice or puri.</li><li>Avoid fried items like pakoras or papad when you can.</li><li>Drink a glass of water before your meal to control your appetite.</li></ul></p>"
+    else: # I live with family
+        living_advice = "<h4>💡 Eating with Family:</h4><p>No need for a separate meal! Just adjust your portions. Take a larger serving of sabzi and dal, and a smaller one of rice or roti. You're still sharing the meal and love, just in a way that serves your goals.</p>"
+
+    day_plan = get_day_on_a_plate(category, diet_type, living_situation, weight, height, age, gender)
+
+    return f"{title}{content}{base_info}<div class='custom-box'>{specific_advice}{living_advice}</div>{day_plan}"
+
+
+@lru_cache(maxsize=4096)
+def get_day_on_a_plate(category, diet_type, living_situation, weight, height, age, gender):
+    # A concrete day of meals sized to the calorie target, kept apart from the rest of
+    # the diet tab (which doesn't depend on the user's measurements) so that part can
+    # go through plan_cache. Empty without a height and age to size it from.
+    if not (height > 0 and age > 0): return ""
+    from core import meals  # imported here so numpy only loads when needed
+    plan = meals.plan(weight, height, age, gender, category, diet_type, living_situation)
+    portion = lambda n, serving: serving if n == 1 else f"{n:g} × {serving}"
+    rows = "".join(
+        f"<li><b>{m.slot}:</b> {'; '.join(f'{item}: {portion(n, serving)}' for item, n, serving in m.items)}"
+        f" <i>— {m.kcal:.0f} kcal, {m.protein:.0f} g protein</i></li>"
+        for m in plan.meals
+    )
+    return f"""<div class='custom-box'>
+    <h4>📋 Your Day on a Plate</h4>
+    <p>Here's one day that adds up to about <b>{plan.kcal:.0f} kcal</b> and <b>{plan.protein:.0f} g protein</b> (your targets: {round(plan.kcal_target, -1):.0f} kcal, {plan.protein_target:.0f} g protein). Swap dishes for similar ones as you like!</p>
+    <ul>{rows}</ul>
+    </div>"""
+
+
+@hooks.timed
+def get_workout_recommendations(category, name):
+    title = f"<h3>🏃‍♀️ {name}, Let's Get Moving and Feel Amazing!</h3>"
+    content = hooks.img_tag("workout.svg")
+    
+    workout_plan = ""
+    if category in ["Overweight", "Obese"]:
+        workout_plan = """
+        <h4>Your Goal: Build Consistency & Joyful Movement</h4>
+        <ul>
+            <li><b>Week 1: The Foundation.</b> Let's begin with a 30-minute brisk walk every day. Put on some music, listen to a podcast, and enjoy this time for yourself!</li>
+            <li><b>Week 2: Building Stamina.</b> Increase your walk to 45 minutes. Focus on your breathing. You're building a powerful habit!</li>
+            <li><b>Week 3: Adding Strength.</b> After your walk, let's add 2 sets of 10 simple squats and 10 wall push-ups. This will start building muscle, which boosts metabolism.</li>
+            <li><b>Beyond:</b> We'll slowly increase the duration and add more fun exercises. The goal is to find movement you love!</li>
+        </ul>
+        """
+    else:
+        workout_plan = """
+        <h4>Your Goal: Maintain Fitness & Build Strength</h4>
+        <ul>
+            <li><b>Your Routine:</b> Aim for 3-5 days of activity per week. A mix of cardio (walking, jogging, cycling) and strength training (yoga, bodyweight exercises) is ideal.</li>
+            <li><b>Try Something New:</b> Explore online dance workouts, try Surya Namaskar for flexibility, or find a sport you enjoy. Keeping it fun is the key to consistency.</li>
+        </ul>
+        """
+    return f"{title}{content}<div class='custom-box'>{workout_plan}</div>"
+
+@hooks.timed
+def get_habit_and_confidence_tips(name):
+    title = f"<h3>💡 Hey {name}, Let's Build Habits for a Confident You!</h3>"
+    content = f"""
+    <h4>Small Steps, Giant Leaps</h4>
+    <ul>
+        <li><b>The 80/20 Rule:</b> Eat healthy 80% of the time, and allow yourself treats 20% of the time. This isn't about restriction; it's about balance.</li>
+        <li><b>Listen to Your Body:</b> Eat when you're hungry, stop when you're satisfied (not stuffed). Your body is incredibly smart!</li>
+        <li><b>Healthy Swaps:</b> Switch to whole wheat roti, use jaggery instead of sugar, and opt for baked/roasted snacks over fried ones.</li>
+    </ul>
+    <h4>💖 Building Unshakable Confidence:</h4>
+    <ul>
+        <li><b>Celebrate Non-Scale Victories:</b> Did your clothes fit better? Did you have more energy? Did you walk further than last week? Celebrate these wins! They matter more than the number on the scale.</li>
+        <li><b>Positive Self-Talk:</b> Speak to yourself like you would a dear friend. Instead of "I have to work out," try "I get to move my body and feel strong."</li>
+        <li><b>You Are More Than a Number:</b> Your weight does not define your worth. This journey is about health, strength, and feeling good in your own skin. You are already amazing, and you've got this!</li>
+    </ul>
+    """
+    return f"{title}<div class='custom-box'>{content}</div>"
+    
+@hooks.timed
+def get_gender_specific_tips(gender, name):
+    title = f"<h3>🌟 Personalized Insights Just for You, {name}</h3>"
+    content = ""
+    if gender == "Female":
+        content = """<h4>Health Focus for Women:</h4><ul><li><b>Iron & Calcium are Key:</b> Ensure your diet is rich in iron (spinach, lentils, beans) and calcium (dairy, ragi, sesame seeds) for bone health and energy levels.</li><li><b>Hormonal Harmony:</b> Regular exercise and a balanced diet can significantly help with managing PMS and maintaining hormonal balance.</li><li><b>Stress & Weight:</b> For many women, stress can lead to weight gain, especially around the midsection. Our stress management tips are extra important for you!</li></ul>"""
+    elif gender == "Male":
+        content = """<h4>Health Focus for Men:</h4><ul><li><b>Protein for Muscle:</b> To build and maintain muscle mass, ensure adequate protein intake from sources like dal, paneer, eggs, or lean meats with every meal.</li><li><b>Heart Health:</b> Focus on a diet low in unhealthy fats and high in fiber (vegetables, whole grains) to keep your heart strong.</li><li><b>Mind the Belly:</b> For many men, excess weight tends to accumulate around the abdomen. Consistent cardio and a clean diet are the best tools to manage this.</li></ul>"""
+    else:
+        content = """<h4>A Holistic Approach to Your Health:</h4><ul><li><b>Listen to Your Body:</b> Your body gives you unique signals. Pay attention to your energy levels, sleep quality, and mood. These are your best indicators of health.</li><li><b>Balanced Nutrition is Universal:</b> A diet rich in a variety of whole foods—vegetables, proteins, healthy fats, and complex carbs—is the foundation of good health for everyone.</li><li><b>Consistency is Your Power:</b> Building a routine that you can stick with is more important than any single diet or workout.</li></ul>"""
+    return f"{title}<div class='custom-box'>{content}</div>"
+
+@hooks.timed
+def get_stress_management_tips(name):
+    title = f"<h3>🧘‍♀️ {name}, Let's Talk About Stress & Wellness</h3>"
+    content = hooks.img_tag("calm.svg")
+    tips = """<p>Stress is a normal part of life, but managing it is crucial for your health. High stress can lead to poor food choices and impact your goals.</p><h4>Simple Techniques to Find Your Calm:</h4><ul><li><b>5-Minute Breathing:</b> When feeling overwhelmed, sit quietly and focus on your breath. Inhale for 4 seconds, hold for 4, and exhale for 6. Repeat for 5 minutes.</li><li><b>Digital Detox:</b> Try to set aside 30 minutes every day where you put your phone away. Go for a walk, listen to music, or just sit with your thoughts.</li><li><b>Schedule 'Me-Time':</b> Just like a meeting, block out time in your calendar for a hobby or activity you love. It's non-negotiable!</li><li><b>Get Quality Sleep:</b> Aim for 7-8 hours of sleep. A well-rested mind is a less-stressed mind.</li></ul>"""
+    return f"{title}{content}<div class='custom-box'>{tips}</div>"
+    
+@hooks.timed
+def get_20_day_plan(name, category, weight, height=0, age=0, gender="Female", chart=None):
+    today = date.today()
+    end_date = today + timedelta(days=20)
+    calories = ""
+    if height > 0 and age > 0:
+        # With BMR inputs available, project the target from a calorie plan
+        # (imported here so numpy only loads once a projection is needed).
+        from core import projection
+        target_weight = projection.project(weight, height, age, gender, category, 20)[-1]
+        calories = f" eating about <b>{round(projection.calorie_target(weight, height, age, gender, category), -1):.0f} kcal</b> a day"
+    else:
+        target_weight = weight
+        if category == "Overweight": target_weight -= 1.5
+        elif category == "Obese": target_weight -= 2.0
+        elif category == "Underweight": target_weight += 1.0
+
+    title = f"<h3>🎯 Your 20-Day Kickstart Plan, {name}!</h3>"
+    # `chart` is a progress chart of the user's check-ins (core.chart.progress_chart);
+    # without one, the chart shows the plan from today's weight.
+    if chart is None:
+        from core import chart as charts
+        chart = charts.projection_chart(weight, height, age, gender, category, today)
+    content = chart
+
+    plan_details = f"""
+    <p>Today is <b>{today.strftime('%B %d, %Y')}</b>. Let's start a 20-day challenge to build momentum! Consistency is more powerful than intensity. Your projected target is to reach <b>{target_weight:.1f} kg</b> by <b>{end_date.strftime('%B %d, %Y')}</b>{calories}.</p>
+    <h4>Your Daily Mini-Goals:</h4>
+    <ul>
+        <li><b>Movement:</b> Complete your recommended walk or activity.</li>
+        <li><b>Hydration:</b> Drink at least 8 glasses of water.</li>
+        <li><b>Mindful Meal:</b> For at least one meal, eat slowly without distractions.</li>
+        <li><b>Reflection:</b> Before bed, think of one healthy choice you made today that made you feel good.</li>
+    </ul>
+    <p>That's it! Small, achievable steps. You can absolutely do this. Let's check in after 20 days and see the amazing progress you've made!</p>
+    """
+    return f"{title}{content}<div class='custom-box'>{plan_details}</div>"
+
+# The India snapshot's static parts, shared by the live tab and get_india_snapshot_html.
+INDIA_TITLE = "<h3>🇮🇳 India's Health Snapshot: You're Part of a National Movement!</h3>"
+INDIA_INTRO = """
+        <div class="custom-box">
+            <p>Your decision to focus on your health is incredibly important. You're joining millions of Indians working towards a healthier future. Here's a look at the bigger picture:</p>
+        </div>
+        """
+INDIA_DEFINITIONS = """
+        <div class="custom-box">
+            <h4>🤔 Do you know? The Definitions Matter!</h4>
+            <ul>
+                <li><b>What is Obesity?</b> According to the WHO, it's an abnormal or excessive fat accumulation that presents a risk to health. A BMI of 30+ is globally considered obese.</li>
+                <li><b>The Indian Context:</b> For the Indian population, the classifications are adjusted. A person is considered <b>overweight</b> if their BMI is between <b>23.0 and 24.9</b>, and <b>obese</b> if their BMI is <b>25 or higher</b>.</li>
+                <li><b>What is BMI?</b> Body Mass Index is a simple check for healthy weight. It's your weight (kg) divided by the square of your height (m). A healthy BMI range is generally <b>18.5 to 24.9</b>.</li>
+            </ul>
+        </div>
+        """
+INDIA_TRENDS_TITLE = """
+        <div class="custom-box">
+            <h4>📈 The Bigger Picture: National & Global Trends</h4>
+        </div>
+        """
+INDIA_KPIS = (
+    ("Overweight Women (NFHS-5)", "24%", None),
+    ("Overweight Men (NFHS-5)", "23%", None),
+    ("Overweight Children <5yrs", "3.4%", "up from 2.1% in 2015-16"),
+)
+INDIA_TRENDS = """
+    <div class="custom-box" style="margin-top: 20px;">
+        <ul>
+            <li>Globally, adult obesity (BMI > 30) has more than doubled since 1990, rising from <b>7% to 16%</b>.</li>
+            <li>In India (ages 15-49), <b>6.4% of women</b> and <b>4.0% of men</b> are classified as obese.</li>
+        </ul>
+        <p style="font-size: 0.9rem; text-align: right; margin-top: 15px;">
+            Source: <a href="https://www.pib.gov.in/PressReleaseIframePage.aspx?PRID=2107179" target="_blank" style="color: #00BCD4;">Press Information Bureau (Govt. of India)</a>
+        </p>
+    </div>
+    <p style='margin-top: 20px;'><b>Your small, consistent steps contribute to changing these statistics for the better. Every walk, every healthy meal, every glass of water—it all counts!</b></p>
+    """
+
+
+@hooks.timed
+def get_india_snapshot():
+    # Renders straight into the page, so streamlit is only imported when it is called.
+    import streamlit as st
+
+    st.markdown(INDIA_TITLE, unsafe_allow_html=True)
+    
+    # This block uses st.markdown for each part to ensure proper rendering.
+    with st.container():
+        st.markdown(INDIA_INTRO, unsafe_allow_html=True)
+        st.markdown(INDIA_DEFINITIONS, unsafe_allow_html=True)
+        st.markdown(INDIA_TRENDS_TITLE, unsafe_allow_html=True)
+
+
+    # Key Statistics using Streamlit's metric component for a nice visual
+    kpi_cols = st.columns(3)
+    for col, (label, value, delta) in zip(kpi_cols, INDIA_KPIS):
+        col.metric(label=label, value=value, delta=delta)
+
+    st.markdown(INDIA_TRENDS, unsafe_allow_html=True)
+
+    _community_snapshot(st)
+
+
+@hooks.timed
+def get_india_snapshot_html():
+    # The same snapshot as one HTML string, for exported documents.
+    kpis = "".join(f"<li><b>{label}:</b> {value}{f' ({delta})' if delta else ''}</li>" for label, value, delta in INDIA_KPIS)
+    return f"{INDIA_TITLE}{INDIA_INTRO}{INDIA_DEFINITIONS}{INDIA_TRENDS_TITLE}<div class='custom-box'><ul>{kpis}</ul></div>{INDIA_TRENDS}"
+
+
+def _community_snapshot(st):
+    # Figures from the precomputed population sketch the app installed (population.py), if one has been ingested.
+    sketch = hooks.population_sketch()
+    if sketch is None or not sketch.count: return
+    st.markdown(f"""
+    <div class="custom-box" style="margin-top: 20px;">
+        <h4>📊 Our Community at a Glance</h4>
+        <p>How the <b>{sketch.count:,}</b> people who have used this planner compare, under both the WHO and the Indian BMI cutoffs.</p>
+    </div>
+    """, unsafe_allow_html=True)
+    who, india = sketch.category_shares("WHO"), sketch.category_shares("India")
+    st.dataframe({
+        "Category": ["Underweight", "Healthy / Normal", "Overweight", "Obese"],
+        "WHO cutoffs": [f"{v:.1%}" for v in who.values()],
+        "Indian cutoffs (23/25)": [f"{v:.1%}" for v in india.values()],
+    }, hide_index=True, width="stretch")
+
+    at_risk = lambda shares: f"{shares['Overweight'] + shares['Obese']:.1%}"
+    by_gender, by_diet = st.columns(2)
+    by_gender.dataframe({
+        "Gender": sketch.GENDERS,
+        "Overweight or obese (Indian cutoffs)": [at_risk(sketch.category_shares("India", gender=g)) for g in sketch.GENDERS],
+    }, hide_index=True, width="stretch")
+    by_diet.dataframe({
+        "Diet": sketch.DIETS,
+        "Overweight or obese (Indian cutoffs)": [at_risk(sketch.category_shares("India", diet=d)) for d in sketch.DIETS],
+    }, hide_index=True, width="stretch")
+
+    whtr = sketch.percentiles("whtr", qs=(0.25, 0.5, 0.9))
+    kpi_cols = st.columns(3)
+    kpi_cols[0].metric(label="Waist-to-Height Ratio, 25th pct.", value=f"{whtr[0.25]:.2f}")
+    kpi_cols[1].metric(label="Waist-to-Height Ratio, median", value=f"{whtr[0.5]:.2f}")
+    kpi_cols[2].metric(label="Waist-to-Height Ratio, 90th pct.", value=f"{whtr[0.9]:.2f}")
@@ -0,0 +1,41 @@
+from functools import wraps
+from time import perf_counter
+
+# What core needs from the app that embeds it, installed with configure(). core
+# has no dependency on the app's own modules: until configured, plan sections
+# have no banner images, nothing is timed, and the India snapshot leaves out the
+# community figures.
+
+_img_tag = lambda name: ""
+_observe = None
+_population = lambda: None
+
+
+def configure(img_tag=None, observe=None, population=None):
+    # img_tag(name) -> HTML for a banner ("thali.svg", ...); observe(name, seconds)
+    # records how long a content generator took; population() -> the current
+    # population sketch, or None.
+    global _img_tag, _observe, _population
+    if img_tag is not None: _img_tag = img_tag
+    if observe is not None: _observe = observe
+    if population is not None: _population = population
+
+
+def img_tag(name):
+    return _img_tag(name)
+
+
+def population_sketch():
+    return _population()
+
+
+def timed(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _observe is None: return fn(*args, **kwargs)
+        start = perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _observe(fn.__name__, perf_counter() - start)
+    return wrapper
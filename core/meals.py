@@ -0,0 +1,193 @@
+import csv
+import itertools
+import os
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from core import projection
+from core.metrics import calculate_bmi, classify_bmi
+
+# Calorie- and protein-targeted day plans built from the dishes in foods.csv
+# (nutrients per serving). Each meal has a fixed shape of dish groups, e.g. a
+# thali is protein dish + staple + sabzi + optional side, and every combination
+# of dishes and portion sizes allowed for a diet type and living situation is
+# enumerated once and cached as a matrix of nutrient totals. Choosing a meal is
+# then one vectorized score-and-argmin over that matrix, for one user or a
+# whole batch at once.
+#
+# Targets come from the same BMR-based calorie target as the 20-day projection,
+# and protein per kg of reference weight (capped at a BMI of 25).
+
+NUTRIENTS = ("kcal", "protein", "carbs", "fat", "fibre")
+DIET_LEVEL = {"Vegetarian": 0, "Eggetarian": 1, "Non-Vegetarian": 2}
+PROTEIN_PER_KG = {"Underweight": 1.2, "Healthy Weight": 1.0, "Overweight": 1.2, "Obese": 1.2}
+
+# (meal, share of the day's calories)
+SLOTS = (("Breakfast", 0.25), ("Lunch", 0.35), ("Dinner", 0.28), ("Snack", 0.12))
+# Meal shapes: (dish groups, portion options); a portion of 0 means the part can be skipped.
+THALI = ((("protein",), (1, 1.5, 2)), (("staple",), (1, 2, 3)), (("veg",), (1,)), (("side",), (0, 1)))
+ONE_POT = ((("one_pot",), (1, 1.5, 2)), (("side",), (0, 1)))
+BREAKFAST = ((("breakfast",), (1, 1.5, 2)), (("extra",), (0, 1)))
+SNACK = ((("snack", "extra"), (1, 2)),)
+# Living situation -> (lunch/dinner shape, only dishes a mess or canteen serves)
+LIVING = {
+    "I live with family": (THALI, False),
+    "I cook for myself": (ONE_POT, False),
+    "I live in a PG/Hostel": (THALI, True),
+}
+
+PROTEIN_WEIGHT = 0.5  # a protein shortfall counts half as much as the same relative calorie miss
+REPEAT_PENALTY = 0.25  # discourages serving the same main dish twice in a day
+KCAL_STEP = 10  # combos this close in calories count as equal when pruning menus
+
+Meal = namedtuple("Meal", "slot items kcal protein")  # items: (name, portions, serving)
+DayPlan = namedtuple("DayPlan", "meals kcal protein kcal_target protein_target")
+Menu = namedtuple("Menu", "items portions totals")
+
+
+# --- Food Database ---
+def _load(path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "foods.csv")):
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    # One extra all-zero row, so index -1 stands for "nothing" in a meal.
+    nutrients = np.array([[float(r[n]) for n in NUTRIENTS] for r in rows] + [[0.0] * len(NUTRIENTS)])
+    return rows, nutrients
+
+
+FOODS, NUTRIENT_TABLE = _load()
+_GROUP = np.array([r["group"] for r in FOODS])
+_LEVEL = np.array([DIET_LEVEL[r["diet"]] for r in FOODS])
+_MESS = np.array([r["mess"] == "1" for r in FOODS])
+
+
+@lru_cache(maxsize=None)
+def food_index(diet, groups, mess_only=False):
+    # Row numbers of the dishes in `groups` that suit `diet` (and a mess, if asked).
+    mask = np.isin(_GROUP, groups) & (_LEVEL <= DIET_LEVEL.get(diet, 0))
+    if mess_only: mask &= _MESS
+    return np.flatnonzero(mask)
+
+
+def _shape(slot, living):
+    shape, mess_only = LIVING.get(living, LIVING["I live with family"])
+    return {"Breakfast": BREAKFAST, "Snack": SNACK}.get(slot, shape), mess_only
+
+
+@lru_cache(maxsize=None)
+def menu(diet, living, slot):
+    # Every allowed combination for one meal: item rows, portions and nutrient totals.
+    shape, mess_only = _shape(slot, living)
+    parts = []
+    for groups, portions in shape:
+        options = [(i, p) for i in food_index(diet, groups, mess_only) for p in portions if p]
+        if 0 in portions: options.append((-1, 0.0))
+        parts.append(options)
+    combos = np.array(list(itertools.product(*parts)), dtype=np.float64)  # (m, parts, 2)
+    items, portions = combos[..., 0].astype(np.int64), combos[..., 1]
+    totals = (NUTRIENT_TABLE[items] * portions[..., None]).sum(axis=1)
+    # The score only sees calories, protein and the main dish, so among combos with the
+    # same main dish and (nearly) the same calories only the most protein-rich can win.
+    key = items[:, 0] * 100_000 + np.rint(totals[:, 0] / KCAL_STEP).astype(np.int64)
+    order = np.lexsort((-totals[:, 1], key))
+    keep = np.sort(order[np.unique(key[order], return_index=True)[1]])
+    items, portions, totals = items[keep], portions[keep], totals[keep]
+    for array in (items, portions, totals): array.flags.writeable = False
+    return Menu(items, portions, totals)
+
+
+# --- Targets ---
+_category = np.frompyfunc(lambda w, h: classify_bmi(calculate_bmi(w, h)), 2, 1)
+
+
+def _classify(weight, height):
+    # BMI category per row, from the scalar helpers so it always agrees with the app.
+    return _category(weight.tolist(), height.tolist()).astype(object)
+
+
+def targets(weight, height, age, gender, category):
+    weight, height = np.asarray(weight, dtype=np.float64), np.asarray(height, dtype=np.float64)
+    category = np.asarray(category, dtype=object)
+    kcal = projection.calorie_targets(weight, height, age, gender, category)
+    heavy = (category == "Overweight") | (category == "Obese")
+    reference = np.where(heavy, np.minimum(weight, 25 * (height / 100) ** 2), weight)
+    per_kg = np.vectorize(PROTEIN_PER_KG.get, otypes=[np.float64])(category, 1.0)
+    return kcal, reference * per_kg
+
+
+# --- Optimizer ---
+def plan_many(kcal_target, protein_target, diet, living, chunk=512):
+    # Chooses every meal for many users sharing a diet and living situation.
+    # Returns {slot: combo index per user} and the day's nutrient totals, shape (n, 5).
+    kcal_target = np.atleast_1d(np.asarray(kcal_target, dtype=np.float64))
+    protein_target = np.atleast_1d(np.asarray(protein_target, dtype=np.float64))
+    n = len(kcal_target)
+    picks, day = {}, np.zeros((n, len(NUTRIENTS)))
+    share_left = 1.0
+    mains = []
+    for slot, share in SLOTS:
+        m = menu(diet, living, slot)
+        # Aim each meal at its share of whatever the earlier meals left over.
+        kcal = (kcal_target - day[:, 0]) * share / share_left
+        protein = np.maximum(protein_target - day[:, 1], 0) * share / share_left
+        choice = np.empty(n, dtype=np.int64)
+        for lo in range(0, n, chunk):
+            hi = min(lo + chunk, n)
+            score = np.abs(m.totals[None, :, 0] / kcal[lo:hi, None] - 1)
+            score += PROTEIN_WEIGHT * np.maximum(0, 1 - m.totals[None, :, 1] / np.maximum(protein[lo:hi, None], 1e-9))
+            for main in mains:
+                score += REPEAT_PENALTY * (m.items[None, :, 0] == main[lo:hi, None])
+            choice[lo:hi] = score.argmin(axis=1)
+        picks[slot] = choice
+        day += m.totals[choice]
+        mains.append(m.items[choice, 0])
+        share_left -= share
+    return picks, day
+
+
+def describe(diet, living, picks, kcal_target, protein_target, user=0):
+    meals, day = [], np.zeros(len(NUTRIENTS))
+    for slot, _ in SLOTS:
+        m = menu(diet, living, slot)
+        combo = picks[slot][user]
+        items = tuple((FOODS[i]["name"], float(p), FOODS[i]["serving"]) for i, p in zip(m.items[combo], m.portions[combo]) if i >= 0)
+        meals.append(Meal(slot, items, float(m.totals[combo, 0]), float(m.totals[combo, 1])))
+        day += m.totals[combo]
+    return DayPlan(tuple(meals), float(day[0]), float(day[1]), float(np.atleast_1d(kcal_target)[user]), float(np.atleast_1d(protein_target)[user]))
+
+
+@lru_cache(maxsize=4096)
+def plan(weight, height, age, gender, category, diet, living):
+    kcal, protein = targets(weight, height, age, gender, category)
+    picks, _ = plan_many(kcal, protein, diet, living)
+    return describe(diet, living, picks, kcal, protein)
+
+
+def plan_table(table):
+    # Batch planning for a column mapping (dict of arrays, DataFrame) with weight,
+    # height, age, gender, diet and living_situation. Returns per-row combo indices
+    # for each meal and the day totals; describe() turns a row back into dishes.
+    # Like plan(), an unknown diet or living situation plans as the default one.
+    # Rows without a positive height and age (see get_day_on_a_plate) get no plan:
+    # combo -1 and NaN totals and targets.
+    n = len(table["weight"])
+    height, age = np.asarray(table["height"], dtype=np.float64), np.asarray(table["age"], dtype=np.float64)
+    valid = (height > 0) & (age > 0)
+    category = _classify(np.asarray(table["weight"], dtype=np.float64), height)
+    kcal, protein = targets(table["weight"], height, age, table["gender"], category)
+    kcal, protein = np.where(valid, kcal, np.nan), np.where(valid, protein, np.nan)
+    diet = np.asarray(table["diet"], dtype=object)
+    diet = np.where(np.isin(diet, list(DIET_LEVEL)), diet, "Vegetarian")
+    living = np.asarray(table["living_situation"], dtype=object)
+    living = np.where(np.isin(living, list(LIVING)), living, "I live with family")
+    picks = {slot: np.full(n, -1, dtype=np.int64) for slot, _ in SLOTS}
+    day = np.full((n, len(NUTRIENTS)), np.nan)
+    for d in DIET_LEVEL:
+        for l in LIVING:
+            rows = np.flatnonzero(valid & (diet == d) & (living == l))
+            if not len(rows): continue
+            group_picks, day[rows] = plan_many(kcal[rows], protein[rows], d, l)
+            for slot, choice in group_picks.items():
+                picks[slot][rows] = choice
+    return picks, day, kcal, protein
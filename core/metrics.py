@@ -0,0 +1,37 @@
+from core.models import HealthMetrics
+
+
+# --- Helper Functions for Health Calculations ---
+def calculate_bmi(w, h): return round(w / ((h / 100) ** 2), 1) if h > 0 else 0
+def classify_bmi(bmi):
+    if bmi < 18.5: return "Underweight"
+    if 18.5 <= bmi <= 24.9: return "Healthy Weight"
+    if 25.0 <= bmi <= 29.9: return "Overweight"
+    return "Obese"
+
+# --- Advanced Metric Functions ---
+def calculate_bsa(w, h): return round(0.007184 * (w ** 0.425) * (h ** 0.725), 2) if w > 0 and h > 0 else 0
+def calculate_pi(w, h): return round(w / ((h/100) ** 3), 1) if h > 0 else 0
+def calculate_bmr(w, h, age, gender):
+    if w <= 0 or h <= 0 or age <= 0: return 0
+    if gender == "Male": return round(10 * w + 6.25 * h - 5 * age + 5)
+    return round(10 * w + 6.25 * h - 5 * age - 161)
+def calculate_ibw(h, gender):
+    h_inches = h * 0.393701
+    if h_inches <= 60: return 0
+    if gender == "Male": return round(52 + 1.9 * (h_inches - 60))
+    return round(49 + 1.7 * (h_inches - 60))
+def calculate_whtr(waist, h): return round(waist / h, 2) if waist > 0 and h > 0 else 0
+
+
+# --- All Metrics for a Profile ---
+def calculate_metrics(user):
+    bmi = calculate_bmi(user.weight, user.height)
+    return HealthMetrics(
+        bmi, classify_bmi(bmi),
+        calculate_bsa(user.weight, user.height),
+        calculate_pi(user.weight, user.height),
+        calculate_bmr(user.weight, user.height, user.age, user.gender),
+        calculate_ibw(user.height, user.gender),
+        calculate_whtr(user.waist, user.height)
+    )
@@ -0,0 +1,31 @@
+# Typed, slotted records for one user's inputs and computed metrics.
+
+
+class UserProfile:
+    __slots__ = ("name", "weight", "height", "diet", "living_situation", "gender", "age", "waist")
+
+    def __init__(self, name="", weight=0.0, height=0.0, diet="Vegetarian",
+                 living_situation="With Family", gender="Female", age=0, waist=0):
+        self.name, self.weight, self.height, self.diet = name, weight, height, diet
+        self.living_situation, self.gender, self.age, self.waist = living_situation, gender, age, waist
+
+    @property
+    def first_name(self):
+        return self.name.split(" ")[0]
+
+    def astuple(self):
+        return tuple(getattr(self, s) for s in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, UserProfile) and self.astuple() == other.astuple()
+
+
+class HealthMetrics:
+    __slots__ = ("bmi", "bmi_category", "bsa", "pi", "bmr", "ibw", "whtr")
+
+    def __init__(self, bmi, bmi_category, bsa, pi, bmr, ibw, whtr):
+        self.bmi, self.bmi_category, self.bsa, self.pi = bmi, bmi_category, bsa, pi
+        self.bmr, self.ibw, self.whtr = bmr, ibw, whtr
+
+    def astuple(self):
+        return tuple(getattr(self, s) for s in self.__slots__)
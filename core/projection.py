@@ -0,0 +1,83 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Day-by-day weight projection driven by BMR. Daily energy use is the
+# Mifflin-St Jeor BMR (same formula as calculate_bmr) times an activity factor
+# matching the workout plan, and intake is a fixed calorie target. Because BMR
+# falls as weight falls, each day's change is linear in the current weight:
+#
+#   w[t+1] = w[t] + (intake - f * (10 * w[t] + c)) / KCAL_PER_KG
+#
+# which has the closed form w[t] = w_eq + (w[0] - w_eq) * a**t. That makes a
+# whole horizon a single vectorized expression for any number of users, and a
+# new logged weight only needs the tail of the series re-anchored.
+
+KCAL_PER_KG = 7700
+
+# The Overweight/Obese plan is a daily 30-45 minute walk (lightly active); the
+# others train 3-5 days a week (moderately active).
+LIGHT, MODERATE = 1.375, 1.55
+CALORIE_ADJUSTMENT = {"Underweight": 400, "Healthy Weight": 0, "Overweight": -500, "Obese": -750}
+MIN_INTAKE = {"Male": 1500}
+DEFAULT_MIN_INTAKE = 1200
+
+
+def activity_factor(category):
+    return LIGHT if category in ("Overweight", "Obese") else MODERATE
+
+
+def _params(w0, h, age, gender, category, intake=None):
+    w0, h, age = (np.asarray(x, dtype=np.float64) for x in (w0, h, age))
+    gender, category = np.asarray(gender, dtype=object), np.asarray(category, dtype=object)
+    f = np.where((category == "Overweight") | (category == "Obese"), LIGHT, MODERATE)
+    c = 6.25 * h - 5 * age + np.where(gender == "Male", 5, -161)
+    if intake is None:
+        adjust = np.vectorize(CALORIE_ADJUSTMENT.get, otypes=[np.float64])(category, 0)
+        floor = np.where(gender == "Male", MIN_INTAKE["Male"], DEFAULT_MIN_INTAKE)
+        intake = np.maximum(f * (10 * w0 + c) + adjust, floor)
+    a = 1 - 10 * f / KCAL_PER_KG
+    w_eq = (np.asarray(intake, dtype=np.float64) - f * c) / (10 * f)
+    return a, w_eq, intake
+
+
+def calorie_target(w0, h, age, gender, category):
+    return float(_params(w0, h, age, gender, category)[2])
+
+
+def calorie_targets(w0, h, age, gender, category):
+    # Vectorized calorie_target, one value per user.
+    return np.atleast_1d(_params(w0, h, age, gender, category)[2]).astype(np.float64)
+
+
+def project_many(w0, h, age, gender, category, horizon, intake=None):
+    # Returns an (n_users, horizon + 1) array; column 0 is the starting weight.
+    a, w_eq, _ = _params(np.atleast_1d(w0), np.atleast_1d(h), np.atleast_1d(age),
+                         np.atleast_1d(gender), np.atleast_1d(category), intake)
+    t = np.arange(horizon + 1)
+    return w_eq[:, None] + (np.atleast_1d(w0) - w_eq)[:, None] * a[:, None] ** t
+
+
+@lru_cache(maxsize=4096)
+def project(w0, h, age, gender, category, horizon, intake=None):
+    weights = project_many(w0, h, age, gender, category, horizon, intake)[0]
+    weights.flags.writeable = False
+    return weights
+
+
+class Trajectory:
+    def __init__(self, w0, h, age, gender, category, horizon, intake=None):
+        a, w_eq, target = _params(w0, h, age, gender, category, intake)
+        self.a, self.w_eq, self.intake = float(a), float(w_eq), float(target)
+        self.weights = project(w0, h, age, gender, category, horizon, intake).copy()
+        self.logged = {}
+
+    def update(self, day, weight):
+        # Re-anchor on a logged weight; days before it keep their projection. A
+        # day past the horizon first extends the projection out to that day.
+        self.logged[day] = weight
+        if day >= len(self.weights):
+            steps = np.arange(1, day - len(self.weights) + 2)
+            self.weights = np.concatenate([self.weights, self.w_eq + (self.weights[-1] - self.w_eq) * self.a ** steps])
+        self.weights[day:] = self.w_eq + (weight - self.w_eq) * self.a ** np.arange(len(self.weights) - day)
+        return self.weights
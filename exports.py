@@ -0,0 +1,173 @@
+import hashlib
+import importlib.util
+import logging
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+
+import reports
+
+# Downloadable copies of the step-2 plan, rendered off the rerun path. submit()
+# returns a handle (the content hash of the inputs) straight away and the
+# document is built by a small pool of low-priority worker processes, so reruns
+# keep their CPU and never wait on the GIL. Finished documents are kept in a
+# size-bounded LRU keyed by that hash, so identical requests are rendered once.
+#
+#   FITNESS_EXPORT_WORKERS   worker processes (default 2)
+#   FITNESS_EXPORT_CACHE_MB  finished documents kept in memory (default 64)
+#
+# PDF output needs the optional weasyprint package; HTML always works. If a
+# worker dies (an OOM kill, a crash in weasyprint), the exports it was running
+# fail and the pool is replaced, so the next request goes through.
+
+log = logging.getLogger(__name__)
+
+MIME = {"html": "text/html", "pdf": "application/pdf"}
+WORKER_NICENESS = 19
+
+
+def pdf_available():
+    return importlib.util.find_spec("weasyprint") is not None
+
+
+def record(profile):
+    # What reports.render_plan needs from a core.models.UserProfile.
+    return {k: getattr(profile, k) for k in ("name", "weight", "height", "age", "gender", "diet", "living_situation")}
+
+
+def content_key(user, fmt):
+    # The goal section shows today's date, so the same inputs tomorrow are a different document.
+    payload = repr((fmt, date.today().isoformat(), sorted(user.items())))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# --- Rendering (runs in worker processes) ---
+def _lower_priority():
+    if hasattr(os, "nice"): os.nice(WORKER_NICENESS)
+
+
+def render(user, fmt):
+    doc = reports.render_document(user["name"], reports.render_plan(user))
+    if fmt == "pdf":
+        from weasyprint import HTML
+        return HTML(string=doc).write_pdf()
+    return doc.encode()
+
+
+# --- Cache ---
+class DocumentCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            doc = self._data.get(key)
+            if doc is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+            return doc
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def put(self, key, doc):
+        with self._lock:
+            if key in self._data: self.size -= len(self._data.pop(key))
+            self._data[key] = doc
+            self.size += len(doc)
+            while self.size > self.max_bytes and len(self._data) > 1:
+                _, old = self._data.popitem(last=False)
+                self.size -= len(old)
+                self.evictions += 1
+
+
+# --- Exporter ---
+class Exporter:
+    def __init__(self, workers=2, max_bytes=64 << 20, max_pending=None):
+        self.workers = workers
+        self.max_pending = max_pending or 4 * workers
+        self.cache = DocumentCache(max_bytes)
+        self._pool = self._new_pool()
+        self._running = {}  # key -> future
+        self._failed = set()
+        self._lock = threading.Lock()
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_lower_priority)
+
+    def _replace_pool(self, broken):
+        # Under self._lock. Only the first caller to see a broken pool replaces it.
+        if self._pool is not broken: return
+        log.error("An export worker died; starting a new pool")
+        self._pool = self._new_pool()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, user, fmt="html"):
+        # Returns the handle, or None if too many exports are already queued.
+        key = content_key(user, fmt)
+        with self._lock:
+            if key in self.cache or key in self._running: return key
+            if len(self._running) >= self.max_pending: return None
+            self._failed.discard(key)
+            pool = self._pool
+            try:
+                future = self._running[key] = pool.submit(render, user, fmt)
+            except BrokenProcessPool:
+                self._replace_pool(pool)
+                self._failed.add(key)
+                return key
+        future.add_done_callback(lambda f: self._finish(key, f, pool))
+        return key
+
+    def _finish(self, key, future, pool):
+        # Cancelled futures (shutdown) go back to "missing"; anything else that
+        # didn't produce a document is "failed". _running is always cleared.
+        error = None if future.cancelled() else future.exception()
+        try:
+            if error is not None:
+                log.error("Plan export failed", exc_info=error)
+            elif not future.cancelled():
+                self.cache.put(key, future.result())
+        finally:
+            with self._lock:
+                self._running.pop(key, None)
+                if error is not None: self._failed.add(key)
+                if isinstance(error, BrokenProcessPool): self._replace_pool(pool)
+
+    def status(self, key):
+        # "ready", "running", "failed", or "missing" (never submitted, or evicted since).
+        with self._lock:
+            if key in self._running: return "running"
+            if key in self._failed: return "failed"
+        return "ready" if key in self.cache else "missing"
+
+    def result(self, key):
+        return self.cache.get(key)
+
+    def pending(self):
+        return len(self._running)
+
+    def shutdown(self):
+        self._pool.shutdown(cancel_futures=True)
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def exporter():
+    # One pool per process, started on first use.
+    global _exporter
+    with _exporter_lock:
+        if _exporter is None:
+            _exporter = Exporter(int(os.environ.get("FITNESS_EXPORT_WORKERS", 2)),
+                                 int(float(os.environ.get("FITNESS_EXPORT_CACHE_MB", 64)) * (1 << 20)))
+        return _exporter
@@ -0,0 +1,145 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Lightweight, process-wide timing and memory instrumentation for App.py reruns.
+# Samples are kept in bounded windows and exported as p50/p95/p99 summaries to
+# a local file: Prometheus text format by default, or JSON lines when the path
+# ends in ".jsonl".
+#
+#   FITNESS_METRICS_FILE      where to export (unset = record only, never write)
+#   FITNESS_METRICS_INTERVAL  minimum seconds between exports (default 10)
+
+QUANTILES = (0.5, 0.95, 0.99)
+WINDOW = 10_000
+
+METRICS_FILE = os.environ.get("FITNESS_METRICS_FILE")
+EXPORT_INTERVAL = float(os.environ.get("FITNESS_METRICS_INTERVAL", 10))
+
+
+class Histogram:
+    def __init__(self, window=WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def quantiles(self):
+        ordered = sorted(self.samples)
+        if not ordered: return {q: 0.0 for q in QUANTILES}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+
+_lock = threading.Lock()
+_spans = {}
+_session_bytes = Histogram()
+_last_export = 0.0
+
+
+def observe(name, seconds):
+    with _lock:
+        _spans.setdefault(name, Histogram()).observe(seconds)
+
+
+@contextmanager
+def span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+# --- Memory ---
+def _deep_size(obj, seen=None):
+    seen = set() if seen is None else seen
+    if id(obj) in seen: return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_size(k, seen) + _deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_size(v, seen) for v in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(_deep_size(getattr(obj, s), seen) for s in obj.__slots__ if hasattr(obj, s))
+    elif hasattr(obj, "__dict__"):
+        size += _deep_size(vars(obj), seen)
+    return size
+
+
+def record_session(state, *extra):
+    # `extra` holds per-session objects kept outside st.session_state.
+    size = sum(_deep_size(state[k]) for k in list(state.keys())) + sum(_deep_size(o) for o in extra)
+    with _lock:
+        _session_bytes.observe(size)
+    return size
+
+
+def max_rss_bytes():
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS.
+    if resource is None: return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+# --- Export ---
+def snapshot():
+    with _lock:
+        spans = {name: {"count": h.count, "sum": h.total, **{f"p{int(q * 100)}": v for q, v in h.quantiles().items()}}
+                 for name, h in _spans.items()}
+        session = {"count": _session_bytes.count, "sum": _session_bytes.total,
+                   **{f"p{int(q * 100)}": v for q, v in _session_bytes.quantiles().items()}}
+    return {"ts": time.time(), "spans": spans, "session_state_bytes": session, "max_rss_bytes": max_rss_bytes()}
+
+
+def to_prometheus(snap):
+    lines = ["# TYPE fitness_span_seconds summary"]
+    for name, s in sorted(snap["spans"].items()):
+        for q in QUANTILES:
+            lines.append(f'fitness_span_seconds{{span="{name}",quantile="{q}"}} {s[f"p{int(q * 100)}"]:.6f}')
+        lines.append(f'fitness_span_seconds_sum{{span="{name}"}} {s["sum"]:.6f}')
+        lines.append(f'fitness_span_seconds_count{{span="{name}"}} {s["count"]}')
+    s = snap["session_state_bytes"]
+    lines.append("# TYPE fitness_session_state_bytes summary")
+    for q in QUANTILES:
+        lines.append(f'fitness_session_state_bytes{{quantile="{q}"}} {s[f"p{int(q * 100)}"]}')
+    lines.append(f'fitness_session_state_bytes_sum {s["sum"]}')
+    lines.append(f'fitness_session_state_bytes_count {s["count"]}')
+    lines.append("# TYPE fitness_process_max_rss_bytes gauge")
+    lines.append(f'fitness_process_max_rss_bytes {snap["max_rss_bytes"]}')
+    return "\n".join(lines) + "\n"
+
+
+def export(path):
+    snap = snapshot()
+    if path.endswith(".jsonl"):
+        with open(path, "a") as f:
+            f.write(json.dumps(snap) + "\n")
+    else:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(to_prometheus(snap))
+        os.replace(tmp, path)
+
+
+def maybe_export():
+    global _last_export
+    if not METRICS_FILE: return
+    now = time.monotonic()
+    with _lock:
+        if now - _last_export < EXPORT_INTERVAL: return
+        _last_export = now
+    export(METRICS_FILE)
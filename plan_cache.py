@@ -0,0 +1,61 @@
+import os
+import threading
+from collections import OrderedDict
+
+# Process-wide cache for the name-independent part of each plan section.
+# App.py is re-executed on every rerun, so the cache has to live in an
+# imported module to be shared by all sessions of the server process.
+
+NAME_TOKEN = "\x00name\x00"
+
+
+class LRUCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "size": len(self._data), "maxsize": self.maxsize}
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+_sections = LRUCache(int(os.environ.get("PLAN_CACHE_SIZE", 256)))
+
+
+def render(fn, *args, name):
+    # Content generators take the user's name as their last argument. The body
+    # is built once with a placeholder name and the real one is swapped in here.
+    body = _sections.get_or_build((fn.__name__,) + args, lambda: fn(*args, NAME_TOKEN))
+    return body.replace(NAME_TOKEN, name)
+
+
+def stats():
+    return _sections.stats()
+
+
+def clear():
+    _sections.clear()
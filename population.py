@@ -0,0 +1,218 @@
+import argparse
+import os
+import threading
+
+import numpy as np
+
+import batch_metrics
+
+# Streaming population statistics for the India Health Snapshot tab. Raw user
+# records are read in chunks and folded into a small, mergeable sketch:
+#
+#   * BMI category counts under both WHO and Indian (23/25) cutoffs, by gender and diet
+#   * BMI and WHtR histograms by gender, at the resolution the app rounds them to
+#     (0.1 and 0.01), so percentiles read from them match exact ones
+#
+# Sketches from separate runs or machines merge by addition, are saved as .npz
+# between restarts, and the tab renders from the saved sketch without touching
+# the raw data.
+#
+#   python population.py ingest users.parquet more_users.csv
+#   python population.py merge shard1.npz shard2.npz
+#   python population.py show
+#
+#   FITNESS_POPULATION_SKETCH  sketch file (default population.npz next to this module)
+
+GENDERS = ("Female", "Male", "Prefer not to say / Other")
+DIETS = ("Vegetarian", "Eggetarian", "Non-Vegetarian", "Not stated")
+SCHEMES = {
+    "WHO": ("Underweight", "Healthy Weight", "Overweight", "Obese"),
+    "India": ("Underweight", "Normal", "Overweight", "Obese"),
+}
+BMI_RANGE, BMI_STEP = (10.0, 60.0), 0.1
+WHTR_RANGE, WHTR_STEP = (0.2, 1.2), 0.01
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "population.npz")
+
+
+def _index(values, labels, default):
+    # Label -> position, looking up each distinct value once rather than every row.
+    distinct, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    lookup = np.array([labels.index(v) if v in labels else default for v in distinct.tolist()], dtype=np.int64)
+    return lookup[inverse.reshape(-1)] if len(distinct) else np.zeros(0, dtype=np.int64)
+
+
+def _bins(values, value_range, step):
+    lo, hi = value_range
+    n = int(round((hi - lo) / step))
+    return np.clip(np.rint((values - lo) / step).astype(np.int64), 0, n), n + 1
+
+
+def classify_who(bmi):
+    # Same bands as batch_metrics.classify_bmi, as indices into SCHEMES["WHO"].
+    return np.select([bmi < 18.5, bmi <= 24.9, (bmi >= 25.0) & (bmi <= 29.9)], [0, 1, 2], default=3)
+
+
+def classify_india(bmi):
+    return np.select([bmi < 18.5, bmi < 23.0, bmi < 25.0], [0, 1, 2], default=3)
+
+
+def _count(target, *indices):
+    # Vectorized "target[indices] += 1" for repeated indices (much faster than np.add.at).
+    flat = np.ravel_multi_index(indices, target.shape)
+    target += np.bincount(flat, minlength=target.size).reshape(target.shape)
+
+
+class PopulationSketch:
+    GENDERS, DIETS = GENDERS, DIETS  # breakdown labels, for readers that only hold a sketch
+
+    def __init__(self):
+        self.categories = np.zeros((len(SCHEMES), len(GENDERS), len(DIETS), 4), dtype=np.int64)
+        self.bmi_hist = np.zeros((len(GENDERS), _bins(np.zeros(0), BMI_RANGE, BMI_STEP)[1]), dtype=np.int64)
+        self.whtr_hist = np.zeros((len(GENDERS), _bins(np.zeros(0), WHTR_RANGE, WHTR_STEP)[1]), dtype=np.int64)
+
+    @property
+    def count(self):
+        return int(self.categories[0].sum())
+
+    # --- Updates ---
+    def update(self, table):
+        # `table` is any column mapping with weight and height (waist, gender, diet optional).
+        n = len(table["weight"])
+        bmi = batch_metrics.calculate_bmi(table["weight"], table["height"])
+        whtr = batch_metrics.calculate_whtr(table["waist"] if "waist" in table else np.zeros(n), table["height"])
+        valid = bmi > 0
+        gender = _index(table["gender"] if "gender" in table else ["Female"] * n, GENDERS, 2)[valid]
+        diet = _index(table["diet"] if "diet" in table else [""] * n, DIETS, 3)[valid]
+        bmi, whtr = bmi[valid], whtr[valid]
+        for scheme, category in enumerate((classify_who(bmi), classify_india(bmi))):
+            _count(self.categories[scheme], gender, diet, category)
+        _count(self.bmi_hist, gender, _bins(bmi, BMI_RANGE, BMI_STEP)[0])
+        has_waist = whtr > 0
+        _count(self.whtr_hist, gender[has_waist], _bins(whtr[has_waist], WHTR_RANGE, WHTR_STEP)[0])
+        return int(valid.sum())
+
+    def merge(self, other):
+        self.categories += other.categories
+        self.bmi_hist += other.bmi_hist
+        self.whtr_hist += other.whtr_hist
+        return self
+
+    # --- Queries ---
+    def category_shares(self, scheme="WHO", gender=None, diet=None):
+        counts = self.categories[list(SCHEMES).index(scheme)]
+        if gender is not None: counts = counts[GENDERS.index(gender)][None]
+        if diet is not None: counts = counts[:, DIETS.index(diet)][:, None]
+        totals = counts.sum(axis=(0, 1))
+        return dict(zip(SCHEMES[scheme], (totals / max(totals.sum(), 1)).tolist()))
+
+    def percentiles(self, metric="whtr", qs=(0.25, 0.5, 0.75, 0.9), gender=None):
+        hist, (lo, _), step = (self.whtr_hist, WHTR_RANGE, WHTR_STEP) if metric == "whtr" else (self.bmi_hist, BMI_RANGE, BMI_STEP)
+        counts = hist[GENDERS.index(gender)] if gender is not None else hist.sum(axis=0)
+        total = counts.sum()
+        if not total: return {q: 0.0 for q in qs}
+        cumulative = np.cumsum(counts)
+        return {q: round(lo + int(np.searchsorted(cumulative, q * total, side="left")) * step, 3) for q in qs}
+
+    # --- Persistence ---
+    def save(self, path):
+        tmp = f"{path}.tmp.npz"
+        np.savez_compressed(tmp, categories=self.categories, bmi_hist=self.bmi_hist, whtr_hist=self.whtr_hist)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        sketch = cls()
+        with np.load(path) as data:
+            sketch.categories, sketch.bmi_hist, sketch.whtr_hist = data["categories"], data["bmi_hist"], data["whtr_hist"]
+        return sketch
+
+
+# --- Chunked Readers ---
+COLUMNS = ["weight", "height", "waist", "gender", "diet"]
+
+
+def read_chunks(path, chunksize=250_000):
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Reading Parquet needs pyarrow: pip install pyarrow")
+        source = pq.ParquetFile(path, memory_map=True)
+        columns = [c for c in COLUMNS if c in source.schema_arrow.names]
+        for batch in source.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+        header = pd.read_csv(path, nrows=0).columns
+        yield from pd.read_csv(path, chunksize=chunksize, memory_map=True, usecols=[c for c in COLUMNS if c in header])
+
+
+def ingest(paths, sketch_path=None, chunksize=250_000):
+    sketch_path = sketch_path or sketch_file()
+    sketch = PopulationSketch.load(sketch_path) if os.path.exists(sketch_path) else PopulationSketch()
+    added = 0
+    for path in paths:
+        for chunk in read_chunks(path, chunksize):
+            if "waist" in chunk: chunk["waist"] = chunk["waist"].fillna(0)
+            added += sketch.update(chunk)
+    sketch.save(sketch_path)
+    return sketch, added
+
+
+# --- Cached Access for the App ---
+_cached = (None, None)
+_cached_lock = threading.Lock()
+
+
+def sketch_file():
+    return os.environ.get("FITNESS_POPULATION_SKETCH", DEFAULT_PATH)
+
+
+def current():
+    # The saved sketch, reloaded only when the file changes; None if nothing was ingested yet.
+    global _cached
+    path = sketch_file()
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _cached_lock:
+        if _cached[0] != mtime:
+            _cached = (mtime, PopulationSketch.load(path))
+        return _cached[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the population sketch behind the India Health Snapshot tab.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--sketch", default=None, help="sketch file (default: $FITNESS_POPULATION_SKETCH or population.npz)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("ingest", parents=[common], help="fold CSV/Parquet files into the sketch")
+    add.add_argument("paths", nargs="+", help="CSV or .parquet with weight and height (waist, gender, diet optional)")
+    add.add_argument("--chunksize", type=int, default=250_000, help="rows read per chunk")
+    merge = sub.add_parser("merge", parents=[common], help="fold other sketch files into the sketch")
+    merge.add_argument("sketches", nargs="+")
+    sub.add_parser("show", parents=[common], help="print the current sketch")
+    args = parser.parse_args(argv)
+    if args.command == "ingest":
+        sketch, added = ingest(args.paths, args.sketch, args.chunksize)
+        print(f"Added {added} records; sketch now covers {sketch.count}.")
+    elif args.command == "merge":
+        path = args.sketch or sketch_file()
+        sketch = PopulationSketch.load(path) if os.path.exists(path) else PopulationSketch()
+        for other in args.sketches:
+            sketch.merge(PopulationSketch.load(other))
+        sketch.save(path)
+        print(f"Merged {len(args.sketches)} sketches; sketch now covers {sketch.count}.")
+    else:
+        path = args.sketch or sketch_file()
+        sketch = PopulationSketch.load(path)
+        print(f"{sketch.count} records")
+        for scheme in SCHEMES:
+            print(scheme, {k: f"{v:.1%}" for k, v in sketch.category_shares(scheme).items()})
+        print("WHtR percentiles", sketch.percentiles("whtr"))
+
+
+if __name__ == "__main__":
+    main()
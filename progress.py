@@ -0,0 +1,97 @@
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+
+import checkins
+from core import chart, projection
+
+# Per-user progress for the 20-day goal tab: the rendered chart and the
+# check-in-anchored projection. Each is kept with the check-in version it was
+# built from, so a rerun costs one indexed COUNT/MAX query; the chart is only
+# redrawn, and the projection only re-anchored on the new entries, after a new
+# check-in (or a profile change that reshapes the projection).
+#
+#   FITNESS_CHART_CACHE_SIZE  users whose charts and projections are kept in memory (default 1024)
+
+
+class UserCache:
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = self.redraws = 0
+        self._data = OrderedDict()  # user -> (version, value), least recently used first
+        self._lock = threading.Lock()
+
+    def peek(self, user):
+        with self._lock:
+            return self._data.get(user)
+
+    def put(self, user, version, value):
+        with self._lock:
+            self._data[user] = (version, value)
+            self._data.move_to_end(user)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get(self, user, version, draw):
+        with self._lock:
+            entry = self._data.get(user)
+            if entry is not None and entry[0] == version:
+                self._data.move_to_end(user)
+                self.hits += 1
+                return entry[1]
+            self.redraws += 1
+        value = draw()
+        self.put(user, version, value)
+        return value
+
+
+_charts = UserCache(int(os.environ.get("FITNESS_CHART_CACHE_SIZE", 1024)))
+_trajectories = UserCache(int(os.environ.get("FITNESS_CHART_CACHE_SIZE", 1024)))
+
+
+def chart_html(uid, profile, category):
+    # None until the user has logged a weight; get_20_day_plan then draws the plan alone.
+    store = checkins.store()
+    version = store.version(uid)
+    if version == (0, None): return None
+    key = version + (profile.height, profile.age, profile.gender, category)
+
+    def draw():
+        logged = store.weights(uid)
+        if not logged: return None
+        start = date.fromisoformat(logged[0][0])
+        days = [(date.fromisoformat(day) - start).days for day, _ in logged]
+        return chart.progress_chart(start, days, [w for _, w in logged], profile.height, profile.age, profile.gender, category)
+
+    return _charts.get(uid, key, draw)
+
+
+def trajectory(uid, profile, category, history):
+    # projection.Trajectory re-anchored on each logged weight in `history`
+    # (CheckinStore.last_days rows, oldest first), counting from its first day.
+    # A new or edited check-in replays only from the earliest day that changed.
+    start = date.fromisoformat(history[0]["day"])
+    params = (profile.weight, profile.height, profile.age, profile.gender, category)
+    version = checkins.store().version(uid)
+    entry = _trajectories.peek(uid)
+    if entry is not None and entry[0] == (version, start, params):
+        _trajectories.hits += 1
+        return entry[1]
+    logged = {(date.fromisoformat(e["day"]) - start).days: e["weight"] for e in history if e["weight"]}
+    current = entry[1] if entry is not None and entry[0][1:] == (start, params) else None
+    if current is None or any(day not in logged for day in current.logged):
+        current = projection.Trajectory(*params, chart.HORIZON)
+    changed = [day for day, weight in logged.items() if current.logged.get(day) != weight]
+    if changed:
+        _trajectories.redraws += 1
+        first = min(changed)
+        for day in sorted(logged):
+            if day >= first: current.update(day, logged[day])
+    _trajectories.put(uid, (version, start, params), current)
+    return current
+
+
+def stats():
+    return {name: {"hits": c.hits, "rebuilds": c.redraws, "size": len(c._data), "maxsize": c.maxsize}
+            for name, c in (("charts", _charts), ("trajectories", _trajectories))}
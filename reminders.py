@@ -0,0 +1,368 @@
+import asyncio
+import heapq
+import json
+import logging
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict, deque, namedtuple
+
+import perf
+
+# Motivational reminders for every user with notifications switched on, driven
+# by one asyncio event loop in a background thread. Pending reminders sit in a
+# timer wheel of 5 ms ticks; the loop sleeps until the earliest non-empty tick,
+# fires everything due, and hands it to the sink in batches. The queue to the
+# sink is bounded, so a slow sink delays reminders instead of piling them up in
+# memory.
+#
+# A sink is any object with `async def send(reminders)`. MemorySink keeps the
+# latest few per user (shown in the app); JsonlSink appends to a file that a
+# push/SMS/email worker can tail.
+#
+# Subscriptions are kept in a store of their own: who has reminders on and
+# which process schedules them. With a "sqlite:<path>" store every app process
+# sees them, so whichever process serves a rerun shows the toggle as the user
+# left it, can turn reminders off, and takes over scheduling them. Before each
+# delivery the scheduling process checks the store and drops users who were
+# unsubscribed or taken over elsewhere, so nobody gets a nudge twice.
+#
+#   FITNESS_REMINDER_SINK           "memory" (default) or a .jsonl path
+#   FITNESS_REMINDER_SUBSCRIPTIONS  "memory" (default, this process only) or "sqlite:<path>" (shared between processes)
+#   FITNESS_REMINDER_SCALE          multiply every interval, e.g. 0.001 for demos (default 1)
+
+log = logging.getLogger(__name__)
+
+Reminder = namedtuple("Reminder", "user kind text due at")
+
+HOUR = 3600.0
+KINDS = {
+    "hydration": (2 * HOUR, "Hey {name}, have you had a glass of water yet? Stay hydrated! 💧"),
+    "encouragement": (24 * HOUR, "You're doing great, {name}! Just a quick reminder that you are strong and capable. Keep going! 💪"),
+}
+
+
+# --- Sinks ---
+class MemorySink:
+    def __init__(self, per_user=5):
+        self.sent = 0
+        self._recent = defaultdict(lambda: deque(maxlen=per_user))
+        self._lock = threading.Lock()  # recent() is called from script threads
+
+    async def send(self, reminders):
+        with self._lock:
+            for r in reminders:
+                self._recent[r.user].append(r)
+        self.sent += len(reminders)
+
+    def recent(self, user):
+        with self._lock:
+            return list(self._recent.get(user, ()))
+
+    def forget(self, user):
+        with self._lock:
+            self._recent.pop(user, None)
+
+
+class JsonlSink:
+    def __init__(self, path):
+        self.path = path
+        self.sent = 0
+
+    def _write(self, lines):
+        with open(self.path, "a") as f:
+            f.writelines(lines)
+
+    async def send(self, reminders):
+        lines = [json.dumps({"user": r.user, "kind": r.kind, "text": r.text, "at": r.at}) + "\n" for r in reminders]
+        await asyncio.get_running_loop().run_in_executor(None, self._write, lines)
+        self.sent += len(reminders)
+
+
+# --- Subscriptions ---
+class MemorySubscriptions:
+    def __init__(self):
+        self._owners = {}  # user -> id of the process scheduling their reminders
+        self._lock = threading.Lock()
+
+    def owner(self, user):
+        with self._lock:
+            return self._owners.get(user)
+
+    def put(self, user, owner):
+        with self._lock:
+            self._owners[user] = owner
+
+    def drop(self, user):
+        with self._lock:
+            self._owners.pop(user, None)
+
+    def owned(self, owner, users):
+        with self._lock:
+            return {u for u in users if self._owners.get(u) == owner}
+
+
+class SQLiteSubscriptions:
+    SCHEMA = "CREATE TABLE IF NOT EXISTS subscriptions (user TEXT PRIMARY KEY, owner TEXT NOT NULL) WITHOUT ROWID"
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._conn().execute(self.SCHEMA)
+
+    def _conn(self):
+        # One connection per thread: script threads and the delivery check both use the store.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def owner(self, user):
+        row = self._conn().execute("SELECT owner FROM subscriptions WHERE user = ?", (user,)).fetchone()
+        return row and row[0]
+
+    def put(self, user, owner):
+        self._conn().execute("INSERT OR REPLACE INTO subscriptions (user, owner) VALUES (?, ?)", (user, owner))
+
+    def drop(self, user):
+        self._conn().execute("DELETE FROM subscriptions WHERE user = ?", (user,))
+
+    def owned(self, owner, users):
+        users = list(users)
+        found = set()
+        for i in range(0, len(users), 500):  # stay under SQLite's bound-parameter limit
+            chunk = users[i:i + 500]
+            found.update(u for (u,) in self._conn().execute(
+                f"SELECT user FROM subscriptions WHERE owner = ? AND user IN ({', '.join('?' * len(chunk))})", (owner, *chunk)))
+        return found
+
+
+def make_subscriptions(spec):
+    if spec.startswith("sqlite:"): return SQLiteSubscriptions(spec[len("sqlite:"):])
+    if spec == "memory": return MemorySubscriptions()
+    raise ValueError(f"Unknown reminder subscription store {spec!r}; use 'memory' or 'sqlite:<path>'")
+
+
+# --- Scheduler ---
+class Scheduler:
+    def __init__(self, sink, batch_size=1000, max_batches=8, kinds=KINDS, scale=1.0, resolution=0.005, active=None):
+        self.sink = sink
+        # Optional active(users) -> the subset still to be reminded, checked (in a
+        # worker thread) before each delivery; the rest are removed.
+        self.active = active
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.kinds = kinds
+        self.scale = scale
+        self.resolution = resolution
+        self.dispatched = self.failed = 0
+        # Timer wheel: entries ([due, user, kind, name, active]) are bucketed by the
+        # `resolution`-sized tick they fall in, and only the tick numbers are kept in a
+        # heap. Firing and rescheduling are list operations; the heap holds one small
+        # int per non-empty tick rather than one entry per reminder.
+        self._buckets = {}  # tick -> entries
+        self._ticks = []
+        self._size = 0
+        self._entries = {}  # user -> their entries
+        self._stale = 0  # cancelled entries not yet discarded
+        self._loop = None
+        self._wake = None
+        self._stopping = False
+
+    def __len__(self):
+        return self._size - self._stale
+
+    def __contains__(self, user):
+        return user in self._entries
+
+    def _push(self, entry):
+        tick = math.ceil(entry[0] / self.resolution)
+        bucket = self._buckets.get(tick)
+        if bucket is None:
+            bucket = self._buckets[tick] = []
+            heapq.heappush(self._ticks, tick)
+            if self._ticks[0] == tick and self._wake: self._wake.set()
+        bucket.append(entry)
+        self._size += 1
+
+    # Loop-side; from other threads use ReminderService.
+    def add(self, user, name, kinds=None, first_due=None):
+        self.cancel(user)
+        now = self._loop.time()
+        entries = self._entries[user] = []
+        for kind in kinds or self.kinds:
+            interval = self.kinds[kind][0] * self.scale
+            # Spread first reminders over one interval so users who subscribe together are not all due together.
+            entry = [now + random.uniform(0, interval) if first_due is None else first_due, user, kind, name, True]
+            self._push(entry)
+            entries.append(entry)
+
+    def remove(self, user):
+        # Unsubscribe: cancel, and drop anything the sink keeps for the user.
+        self.cancel(user)
+        forget = getattr(self.sink, "forget", None)
+        if forget: forget(user)
+
+    def cancel(self, user):
+        for entry in self._entries.pop(user, ()):
+            entry[4] = False
+            self._stale += 1
+        if self._stale > len(self) + 1024:
+            self._buckets = {t: live for t, v in self._buckets.items() if (live := [e for e in v if e[4]])}
+            self._ticks = list(self._buckets)
+            heapq.heapify(self._ticks)
+            self._size, self._stale = sum(map(len, self._buckets.values())), 0
+
+    def _due(self, now):
+        batch, at = [], time.time()
+        while self._ticks and self._ticks[0] * self.resolution <= now:
+            bucket = self._buckets.pop(heapq.heappop(self._ticks))
+            self._size -= len(bucket)
+            for entry in bucket:
+                due, user, kind, name, active = entry
+                if not active:
+                    self._stale -= 1
+                    continue
+                interval, text = self.kinds[kind]
+                batch.append(Reminder(user, kind, text.format(name=name), due, at))
+                # Next occurrence counts from the due time, not from now, so lateness never
+                # accumulates; occurrences missed during a stall are skipped, not sent in a burst.
+                step = interval * self.scale
+                entry[0] = due + (math.floor((now - due) / step) + 1) * step
+                self._push(entry)
+        return batch
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        batches = asyncio.Queue(self.max_batches)
+        dispatcher = asyncio.create_task(self._dispatch(batches))
+        try:
+            while not self._stopping:
+                now = self._loop.time()
+                due = self._due(now)
+                for i in range(0, len(due), self.batch_size):
+                    await batches.put(due[i:i + self.batch_size])  # waits while max_batches are queued: backpressure
+                if due: continue
+                self._wake.clear()
+                timeout = self._ticks[0] * self.resolution - now if self._ticks else None
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            await batches.join()
+        finally:
+            dispatcher.cancel()
+
+    async def _dispatch(self, batches):
+        while True:
+            batch = await batches.get()
+            count = 1
+            while len(batch) < self.batch_size and not batches.empty():
+                batch = batch + batches.get_nowait()
+                count += 1
+            # Users who unsubscribed while their reminders were queued get nothing.
+            batch = [r for r in batch if r.user in self._entries]
+            if batch and self.active is not None:
+                users = {r.user for r in batch}
+                try:
+                    keep = await self._loop.run_in_executor(None, self.active, users)
+                except Exception:
+                    log.exception("Reminder subscription check failed; delivering anyway")
+                    keep = users
+                for user in users - keep: self.remove(user)
+                batch = [r for r in batch if r.user in keep]
+            if not batch:
+                for _ in range(count): batches.task_done()
+                continue
+            try:
+                await self.sink.send(batch)
+                self.dispatched += len(batch)
+            except Exception:
+                self.failed += len(batch)
+                log.exception("Reminder sink failed; dropped %d reminders", len(batch))
+            perf.observe("reminders.lag", self._loop.time() - min(r.due for r in batch))
+            for _ in range(count):
+                batches.task_done()
+
+    def stop(self):
+        self._stopping = True
+        if self._wake: self._wake.set()
+
+
+# --- Background Service for the App ---
+class ReminderService:
+    def __init__(self, scheduler, subscriptions=None):
+        self.scheduler = scheduler
+        self.subscriptions = subscriptions or MemorySubscriptions()
+        self.id = uuid.uuid4().hex  # this process, as an owner in the subscription store
+        self._users = set()  # scheduled here; updated by the caller, so it is current before the loop catches up
+        scheduler.active = self._still_owned
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="reminders", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        async def main():
+            self._loop = asyncio.get_running_loop()
+            task = asyncio.create_task(self.scheduler.run())
+            await asyncio.sleep(0)
+            self._ready.set()
+            await task
+        asyncio.run(main())
+
+    def _still_owned(self, users):
+        keep = self.subscriptions.owned(self.id, users)
+        self._users.difference_update(users - keep)
+        return keep
+
+    def subscribe(self, user, name):
+        # Also takes the user over from whichever process scheduled them before.
+        self.subscriptions.put(user, self.id)
+        self._users.add(user)
+        self._loop.call_soon_threadsafe(self.scheduler.add, user, name)
+
+    def unsubscribe(self, user):
+        # Works from any process; the one scheduling the user drops them before the next delivery.
+        self.subscriptions.drop(user)
+        if user in self._users:
+            self._users.discard(user)
+            self._loop.call_soon_threadsafe(self.scheduler.remove, user)
+
+    def subscribed(self, user):
+        return self.subscriptions.owner(user) is not None
+
+    def scheduled(self, user):
+        # Subscribed, with reminders scheduled by this process.
+        return user in self._users
+
+    def recent(self, user):
+        # Latest delivered reminders, when the sink keeps them (MemorySink does).
+        recent = getattr(self.scheduler.sink, "recent", None)
+        return recent(user) if recent else []
+
+
+def make_sink(spec):
+    return MemorySink() if spec in (None, "", "memory") else JsonlSink(spec)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def service():
+    # One scheduler thread per process, started on first use.
+    global _service
+    with _service_lock:
+        if _service is None:
+            sink = make_sink(os.environ.get("FITNESS_REMINDER_SINK"))
+            _service = ReminderService(Scheduler(sink, scale=float(os.environ.get("FITNESS_REMINDER_SCALE", 1))),
+                                       make_subscriptions(os.environ.get("FITNESS_REMINDER_SUBSCRIPTIONS", "memory")))
+        return _service
@@ -0,0 +1,219 @@
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from html import escape
+from itertools import islice
+
+import assets
+import plan_cache
+from core import hooks
+from core.content import (
+    get_20_day_plan, get_day_on_a_plate, get_diet_recommendations, get_gender_specific_tips,
+    get_habit_and_confidence_tips, get_india_snapshot_html, get_stress_management_tips, get_workout_recommendations,
+)
+from core.metrics import calculate_bmi, classify_bmi
+
+# Headless plan generator: renders the same sections as the step-2 tabs for a
+# whole file of users, across a process pool, without going through Streamlit.
+#
+#   python reports.py users.csv plans.jsonl
+#   python reports.py users.jsonl plans/ --format html --workers 8
+#
+# Work is submitted in chunks with a bounded number in flight. Each finished
+# chunk is appended to a checkpoint file along with the output size after it,
+# so an interrupted run restarted with --resume cuts off anything written past
+# the last checkpoint and skips the chunks it already wrote. Rows with a
+# missing or unparseable weight or height are skipped and counted.
+
+SECTIONS = (
+    ("goal", "🎯 Your 20-Day Goal"), ("diet", "🥗 Diet Plan"), ("workout", "🏃‍♀️ Workout Plan"),
+    ("habits", "💡 Habits & Confidence"), ("india", "🇮🇳 India Health Snapshot"), ("insights", "🌟 Personalized Insights"),
+    ("stress", "🧘‍♀️ Stress & Wellness"),
+)
+DEFAULTS = {"diet": "Vegetarian", "living_situation": "I live with family", "gender": "Female"}
+
+# Also runs in each worker process, which imports this module.
+hooks.configure(img_tag=assets.img_tag)
+
+
+# --- Input ---
+def read_records(path):
+    with open(path, newline="") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip(): yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+
+def _user(record, index):
+    # None if the row can't be used.
+    user = {k: record.get(k) or v for k, v in DEFAULTS.items()}
+    user["id"] = str(record.get("id") or index)
+    user["name"] = record.get("name") or ""
+    try:
+        user["weight"] = float(record["weight"])
+        user["height"] = float(record["height"])
+        user["age"] = int(float(record.get("age") or 0))
+    except (KeyError, TypeError, ValueError):
+        return None
+    return user
+
+
+def _users(src, skipped):
+    for index, record in enumerate(read_records(src)):
+        user = _user(record, index)
+        if user is None: skipped[0] += 1
+        else: yield user
+
+
+# --- Rendering (runs in worker processes) ---
+def render_plan(user):
+    # The generators put the name into HTML as is, and these files end up in emails
+    # and downloads, so it is escaped here.
+    name = escape(user["name"].split(" ")[0])
+    category = classify_bmi(calculate_bmi(user["weight"], user["height"]))
+    return {
+        "goal": get_20_day_plan(name, category, user["weight"], user["height"], user["age"], user["gender"]),
+        "diet": plan_cache.render(get_diet_recommendations, category, user["diet"], user["living_situation"], name=name)
+        + get_day_on_a_plate(category, user["diet"], user["living_situation"], user["weight"], user["height"], user["age"], user["gender"]),
+        "workout": plan_cache.render(get_workout_recommendations, category, name=name),
+        "habits": plan_cache.render(get_habit_and_confidence_tips, name=name),
+        "india": get_india_snapshot_html(),
+        "insights": plan_cache.render(get_gender_specific_tips, user["gender"], name=name),
+        "stress": plan_cache.render(get_stress_management_tips, name=name),
+    }
+
+
+def render_document(name, sections):
+    body = "".join(f"<section><h2>{title}</h2>{sections[key]}</section>" for key, title in SECTIONS)
+    return assets.inline(
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{escape(name)}'s Personal Plan</title>"
+        f"<style>body{{margin:0 auto;max-width:900px;padding:20px}}{assets.stylesheet_css()}</style></head>"
+        f"<body class='stApp'><h1>✨ Your Personalized Action Plan</h1>{body}</body></html>"
+    )
+
+
+def _render_chunk(users, fmt):
+    out = []
+    for user in users:
+        sections = render_plan(user)
+        if fmt == "html":
+            out.append((user["id"], user["name"], render_document(user["name"], sections)))
+        else:
+            out.append((user["id"], user["name"], {k: assets.inline(v) for k, v in sections.items()}))
+    return out
+
+
+# --- Output ---
+class _Writer:
+    def __init__(self, dst, fmt, offset=0):
+        # JSONL output is cut back to `offset`, the size at the last checkpointed chunk.
+        self.dst, self.fmt = dst, fmt
+        if fmt == "html":
+            os.makedirs(dst, exist_ok=True)
+        else:
+            self._file = open(dst, "r+" if offset else "w")
+            self._file.seek(offset)
+            self._file.truncate()
+
+    def tell(self):
+        return 0 if self.fmt == "html" else self._file.tell()
+
+    def write(self, results):
+        if self.fmt == "html":
+            for uid, _, doc in results:
+                with open(os.path.join(self.dst, re.sub(r"[^\w.-]", "_", uid) + ".html"), "w") as f: f.write(doc)
+        else:
+            self._file.writelines(json.dumps({"id": uid, "name": name, "sections": s}) + "\n" for uid, name, s in results)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self.fmt != "html": self._file.close()
+
+
+def _load_checkpoint(path, chunksize):
+    # Returns ({chunk: output size after it}, size after the last one). The first
+    # line records the chunk size; chunk numbers only mean something for the same
+    # size. A line cut off by a crash is ignored.
+    if not os.path.exists(path): return {}, 0
+    with open(path) as f:
+        lines = f.read().split("\n")[:-1]
+    if lines and int(lines[0]) != chunksize:
+        raise SystemExit(f"{path} was written with a different --chunksize; remove it or match it.")
+    done, offset = {}, 0
+    for line in lines[1:]:
+        index, offset = (int(n) for n in line.split())
+        done[index] = offset
+    return done, offset
+
+
+def generate(src, dst, fmt="jsonl", workers=None, chunksize=500, resume=False, progress=sys.stderr):
+    workers = workers or os.cpu_count() or 1
+    checkpoint = (dst.rstrip("/\\") if fmt == "html" else dst) + ".checkpoint"
+    done, offset = _load_checkpoint(checkpoint, chunksize) if resume else ({}, 0)
+    writer = _Writer(dst, fmt, offset)
+    skipped = [0]
+    with open(checkpoint, "w") as ckpt:
+        ckpt.write(f"{chunksize}\n")
+        ckpt.writelines(f"{index} {end}\n" for index, end in done.items())
+        ckpt.flush()
+        records = _users(src, skipped)
+        chunks = enumerate(iter(lambda: list(islice(records, chunksize)), []))
+        rendered, start = 0, time.monotonic()
+        with ProcessPoolExecutor(workers) as pool:
+            pending = {}
+            for index, users in chunks:
+                if index in done: continue
+                pending[pool.submit(_render_chunk, users, fmt)] = index
+                # Keep at most two chunks per worker in flight so memory stays bounded.
+                while len(pending) >= 2 * workers:
+                    rendered += _drain(pending, writer, ckpt)
+                    _report(progress, rendered, skipped[0], start)
+            while pending:
+                rendered += _drain(pending, writer, ckpt)
+                _report(progress, rendered, skipped[0], start)
+    writer.close()
+    return rendered, skipped[0]
+
+
+def _drain(pending, writer, ckpt):
+    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+    count = 0
+    for future in finished:
+        results = future.result()
+        writer.write(results)
+        ckpt.write(f"{pending.pop(future)} {writer.tell()}\n")
+        ckpt.flush()
+        count += len(results)
+    return count
+
+
+def _report(progress, rendered, skipped, start):
+    if progress:
+        elapsed = time.monotonic() - start
+        progress.write(f"\r{rendered} plans rendered ({rendered / max(elapsed, 1e-9):.0f}/s), {skipped} bad rows skipped")
+        progress.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render personalised plans for a file of users.")
+    parser.add_argument("input", help="CSV or .jsonl with name, weight, height (age, diet, living_situation, gender, id optional)")
+    parser.add_argument("output", help=".jsonl file, or a directory with --format html")
+    parser.add_argument("--format", choices=("jsonl", "html"), default="jsonl")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=500, help="users per unit of work")
+    parser.add_argument("--resume", action="store_true", help="skip chunks recorded in the checkpoint file")
+    args = parser.parse_args(argv)
+    rendered, skipped = generate(args.input, args.output, args.format, args.workers, args.chunksize, args.resume)
+    print(f"\nWrote {rendered} plans -> {args.output} ({skipped} rows skipped: missing or invalid weight/height)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
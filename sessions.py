@@ -0,0 +1,231 @@
+import os
+import sqlite3
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+import perf
+from core.models import HealthMetrics, UserProfile
+
+# Per-session state (the step, profile and metrics) kept outside the Streamlit
+# process, so any worker can resume a session at the right step and a
+# restarted worker loses nobody. A session is keyed by an id in the page URL and stored as a small
+# binary record; App.py loads it once per rerun and saves it only when it
+# changed.
+#
+# Reminder subscriptions have their own shared store (reminders.py). Prepared
+# downloads (exports.py) are not shared: another process builds the document
+# again when asked.
+#
+#   FITNESS_SESSION_BACKEND   "memory" (default, this process only) or "sqlite:<path>" (shared between processes)
+#   FITNESS_SESSION_IDLE_TTL  seconds of inactivity before a session's data is dropped (default 1800)
+#   FITNESS_MAX_SESSIONS      hard cap on sessions in memory, least recently used first (0 = no cap)
+#
+# A backend is any object with get(sid) -> bytes | None, put(sid, bytes) and drop(sid).
+
+
+# --- Compact Encoding ---
+# version, step, flags | profile: weight, height, age, waist, then enums and name |
+# metrics: bmi, bsa, pi, bmr, ibw, whtr, then the category enum. Around 50 bytes.
+VERSION = 1
+HAS_PROFILE, HAS_METRICS = 1, 2
+DIETS = ("Vegetarian", "Eggetarian", "Non-Vegetarian")
+LIVING = ("I live with family", "I cook for myself", "I live in a PG/Hostel")
+GENDERS = ("Female", "Male", "Prefer not to say / Other")
+CATEGORIES = ("Underweight", "Healthy Weight", "Overweight", "Obese")
+OTHER = 255  # enum value followed by the string itself
+
+_HEADER = struct.Struct("<BBB")
+_PROFILE = struct.Struct("<ffHH")
+_METRICS = struct.Struct("<fffiHf")
+
+
+class Session:
+    __slots__ = ("step", "profile", "metrics", "stored")
+
+    def __init__(self, step=0, profile=None, metrics=None, stored=None):
+        self.step, self.profile, self.metrics = step, profile, metrics
+        self.stored = stored  # the encoded form last read or written, to skip unchanged saves
+
+
+def _text(value):
+    data = value.encode()[:255]
+    return bytes([len(data)]) + data
+
+
+def _enum(value, choices):
+    return bytes([choices.index(value)]) if value in choices else bytes([OTHER]) + _text(value)
+
+
+def encode(session):
+    flags = (HAS_PROFILE if session.profile else 0) | (HAS_METRICS if session.metrics else 0)
+    parts = [_HEADER.pack(VERSION, session.step, flags)]
+    if session.profile:
+        p = session.profile
+        parts += [_PROFILE.pack(p.weight, p.height, p.age, p.waist), _enum(p.diet, DIETS),
+                  _enum(p.living_situation, LIVING), _enum(p.gender, GENDERS), _text(p.name)]
+    if session.metrics:
+        m = session.metrics
+        parts += [_METRICS.pack(m.bmi, m.bsa, m.pi, m.bmr, m.ibw, m.whtr), _enum(m.bmi_category, CATEGORIES)]
+    return b"".join(parts)
+
+
+def decode(data):
+    view = memoryview(data)
+    version, step, flags = _HEADER.unpack_from(view)
+    if version != VERSION: return Session()
+    pos = _HEADER.size
+
+    def text():
+        nonlocal pos
+        n = view[pos]
+        value = bytes(view[pos + 1:pos + 1 + n]).decode(errors="ignore")
+        pos += 1 + n
+        return value
+
+    def enum(choices):
+        nonlocal pos
+        i = view[pos]
+        pos += 1
+        return text() if i == OTHER else choices[i]
+
+    profile = metrics = None
+    if flags & HAS_PROFILE:
+        weight, height, age, waist = _PROFILE.unpack_from(view, pos)
+        pos += _PROFILE.size
+        diet, living, gender = enum(DIETS), enum(LIVING), enum(GENDERS)
+        # float32 on the wire; the inputs and metrics are rounded to 2 decimals or fewer anyway.
+        profile = UserProfile(text(), round(weight, 2), round(height, 2), diet, living, gender, age, waist)
+    if flags & HAS_METRICS:
+        bmi, bsa, pi, bmr, ibw, whtr = _METRICS.unpack_from(view, pos)
+        pos += _METRICS.size
+        metrics = HealthMetrics(round(bmi, 1), enum(CATEGORIES), round(bsa, 2), round(pi, 1), bmr, ibw, round(whtr, 2))
+    return Session(step, profile, metrics, bytes(data))
+
+
+# --- Backends ---
+class MemoryBackend:
+    def __init__(self, idle_ttl=1800.0, max_sessions=0):
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.evictions = 0
+        # session id -> [data, last_seen], least recently used first
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now):
+        while self._data:
+            sid, entry = next(iter(self._data.items()))
+            over_cap = self.max_sessions and len(self._data) > self.max_sessions
+            if not over_cap and now - entry[1] < self.idle_ttl: break
+            del self._data[sid]
+            self.evictions += 1
+
+    def get(self, sid):
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._data.get(sid)
+            if entry is None: return None
+            entry[1] = now
+            self._data.move_to_end(sid)
+            return entry[0]
+
+    def put(self, sid, data):
+        now = time.monotonic()
+        with self._lock:
+            self._data[sid] = [data, now]
+            self._data.move_to_end(sid)
+            self._evict(now)
+
+    def drop(self, sid):
+        with self._lock:
+            self._data.pop(sid, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteBackend:
+    SCHEMA = "CREATE TABLE IF NOT EXISTS sessions (sid TEXT PRIMARY KEY, data BLOB NOT NULL, seen REAL NOT NULL) WITHOUT ROWID"
+
+    def __init__(self, path, idle_ttl=1800.0, purge_interval=60.0):
+        self.path = path
+        self.idle_ttl = idle_ttl
+        self.purge_interval = purge_interval
+        self._local = threading.local()
+        self._last_purge = 0.0
+        self._conn().execute(self.SCHEMA)
+
+    def _conn(self):
+        # One connection per thread; Streamlit runs each session's script in its own thread.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get(self, sid):
+        now = time.time()
+        row = self._conn().execute("SELECT data, seen FROM sessions WHERE sid = ?", (sid,)).fetchone()
+        if row is None or now - row[1] > self.idle_ttl: return None
+        # Refresh the idle clock now and then, rather than writing on every read.
+        if now - row[1] > self.idle_ttl / 4:
+            self._conn().execute("UPDATE sessions SET seen = ? WHERE sid = ?", (now, sid))
+        return row[0]
+
+    def put(self, sid, data):
+        now = time.time()
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO sessions (sid, data, seen) VALUES (?, ?, ?)", (sid, data, now))
+        if now - self._last_purge > self.purge_interval:
+            self._last_purge = now
+            conn.execute("DELETE FROM sessions WHERE seen < ?", (now - self.idle_ttl,))
+
+    def drop(self, sid):
+        self._conn().execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+def make_backend(spec, idle_ttl=1800.0, max_sessions=0):
+    if spec.startswith("sqlite:"): return SQLiteBackend(spec[len("sqlite:"):], idle_ttl)
+    if spec == "memory": return MemoryBackend(idle_ttl, max_sessions)
+    raise ValueError(f"Unknown session backend {spec!r}; use 'memory' or 'sqlite:<path>'")
+
+
+BACKEND = make_backend(os.environ.get("FITNESS_SESSION_BACKEND", "memory"),
+                       float(os.environ.get("FITNESS_SESSION_IDLE_TTL", 1800)),
+                       int(os.environ.get("FITNESS_MAX_SESSIONS", 0)))
+
+
+# --- Per-Rerun Access ---
+def load(sid, backend=None):
+    with perf.span("session.load"):
+        data = (backend or BACKEND).get(sid)
+        return decode(data) if data else Session()
+
+
+def save(sid, session, backend=None):
+    # Writes only if the encoded session differs from what was loaded or last saved.
+    data = encode(session)
+    if data == session.stored: return False
+    with perf.span("session.save"):
+        (backend or BACKEND).put(sid, data)
+    session.stored = data
+    return True
+
+
+def drop(sid, backend=None):
+    (backend or BACKEND).drop(sid)
+
+
+def current_id():
+    # Kept in the URL (also the check-in id), so it survives reconnects to any worker.
+    import streamlit as st
+    import uuid
+    if "uid" not in st.query_params: st.query_params["uid"] = uuid.uuid4().hex[:16]
+    return st.query_params["uid"]
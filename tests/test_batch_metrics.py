@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+import batch_metrics
+from core import metrics
+
+# score() must agree with the scalar calculators in core.metrics element by
+# element, including types of result (floats for rounded metrics, ints for BMR/IBW).
+
+GENDERS = ("Female", "Male", "Prefer not to say / Other")
+
+
+def scalar_score(weight, height, age, waist, gender):
+    rows = zip(weight, height, age, waist, gender)
+    out = {c: [] for c in batch_metrics.METRIC_COLUMNS}
+    for w, h, a, wc, g in rows:
+        bmi = metrics.calculate_bmi(w, h)
+        out["bmi"].append(bmi)
+        out["bmi_category"].append(metrics.classify_bmi(bmi))
+        out["bsa"].append(metrics.calculate_bsa(w, h))
+        out["pi"].append(metrics.calculate_pi(w, h))
+        out["bmr"].append(metrics.calculate_bmr(w, h, a, g))
+        out["ibw"].append(metrics.calculate_ibw(h, g))
+        out["whtr"].append(metrics.calculate_whtr(wc, h))
+    return out
+
+
+def assert_matches(weight, height, age, waist, gender):
+    vector = batch_metrics.score(weight, height, age, waist, gender)
+    expected = scalar_score(weight, height, age, waist, gender)
+    for column in batch_metrics.METRIC_COLUMNS:
+        got = vector[column].tolist()
+        mismatches = [(i, g, e) for i, (g, e) in enumerate(zip(got, expected[column])) if g != e]
+        assert not mismatches, f"{column}: {len(mismatches)} mismatches, first {mismatches[:3]}"
+
+
+def test_random_realistic_grid():
+    rng = np.random.default_rng(0)
+    n = 50_000
+    weight = np.round(rng.uniform(30, 200, n), 1).tolist()
+    height = np.round(rng.uniform(100, 250, n), 1).tolist()
+    age = rng.integers(0, 100, n).tolist()
+    waist = rng.integers(0, 200, n).tolist()
+    gender = [GENDERS[i] for i in rng.integers(0, 3, n)]
+    assert_matches(weight, height, age, waist, gender)
+
+
+def test_zero_and_negative_guards():
+    values = [-10.0, -0.5, 0.0, 0.5, 60.0]
+    grid = [(w, h, a, wc) for w in values for h in values + [150.0] for a in (-5, 0, 30) for wc in (-1, 0, 80)]
+    weight, height, age, waist = (list(c) for c in zip(*grid))
+    assert_matches(weight, height, age, waist, ["Male", "Female"] * (len(grid) // 2))
+
+
+@pytest.mark.parametrize("bmi", [24.9, 24.91, 24.95, 24.99, 25.0, 18.49, 18.5, 29.9, 29.95, 30.0])
+def test_category_edges(bmi):
+    # 24.9 < BMI < 25.0 (and 29.9-30.0) fall through to "Obese" in the scalar helper.
+    assert batch_metrics.classify_bmi([bmi])[0] == metrics.classify_bmi(bmi)
+
+
+def test_bmi_between_category_bands():
+    # Heights of 100 cm make BMI equal to the weight, so these land on and between the bands.
+    weight = [24.9, 24.94, 24.95, 24.96, 25.0, 29.94, 29.95, 29.96]
+    assert_matches(weight, [100.0] * len(weight), [30] * len(weight), [80] * len(weight), ["Female"] * len(weight))
+
+
+def test_half_rounding_boundaries():
+    # With a 100 cm height BMI and PI equal the weight, and WHtR is waist / 100, so
+    # these rows sit exactly on (or one float step from) a .5 rounding boundary.
+    base = [k + d for k in range(20, 120) for d in (0.05, 0.15, 0.25, 0.35, 0.45)]
+    weight = [float(v) for b in base for v in (b, np.nextafter(b, 0), np.nextafter(b, 1e9))]
+    waist = [w * 10 for w in weight]  # WHtR lands on x.xx5
+    n = len(weight)
+    assert_matches(weight, [100.0] * n, [30] * n, waist, ["Male"] * n)
+
+
+def test_tiny_heights():
+    # BMI and PI get very large here, where an absolute tolerance misses boundary rows.
+    rng = np.random.default_rng(1)
+    n = 100_000
+    weight = np.round(rng.uniform(1, 300, n), 1).tolist()
+    height = np.round(rng.uniform(0.01, 10, n), 2).tolist()
+    assert_matches(weight, height, [30] * n, [80] * n, ["Female"] * n)
+
+
+def test_missing_inputs_get_no_category():
+    nan = float("nan")
+    out = batch_metrics.score([nan, 70.0, nan, 70.0], [170.0, nan, nan, 170.0], [30] * 4, [80] * 4, ["Female"] * 4)
+    assert out["bmi_category"].tolist() == ["", "", "", "Healthy Weight"]
+    assert np.isnan(out["bmi"][:3]).all()
+
+
+def test_score_csv_leaves_input_columns_as_read(tmp_path):
+    pd = pytest.importorskip("pandas")
+    src, dst = tmp_path / "in.csv", tmp_path / "out.csv"
+    src.write_text("weight,height,age,waist,gender\n70,170,30,80,Male\n,170,,,\n70,170,31,82,Female\n")
+    assert batch_metrics.score_csv(src, dst, chunksize=2) == 3
+    out = pd.read_csv(dst, keep_default_na=False)
+    assert out["age"].astype(str).tolist() == ["30", "", "31"]
+    assert out["gender"].tolist() == ["Male", "", "Female"]
+    assert out["bmi_category"].tolist() == ["Healthy Weight", "", "Healthy Weight"]
@@ -0,0 +1,64 @@
+import sqlite3
+import time
+from datetime import date
+
+import checkins
+
+# The writer thread keeps a batch that fails to commit and retries it, and the
+# rows stay visible to reads in the meantime.
+
+DAY = date(2026, 1, 2)
+
+
+class FlakyConnection:
+    # Stands in for the writer's connection; every transaction fails while `down`.
+    def __init__(self, conn):
+        self.conn, self.down = conn, True
+
+    def execute(self, sql, *args):
+        if self.down and sql == "BEGIN IMMEDIATE": raise sqlite3.OperationalError("database is locked")
+        return self.conn.execute(sql, *args)
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_failed_commit_keeps_rows_readable_and_commits_them_later(tmp_path):
+    path = str(tmp_path / "checkins.db")
+    store = checkins.CheckinStore(path, max_backoff=0.01)
+    conn = store._writer_conn = FlakyConnection(store._writer_conn)
+    store.record("priya", DAY, weight=70.5, movement=True)
+    wait_for(lambda: store.failing)
+
+    rows = store.last_days("priya", n=1, today=DAY)
+    assert [(r["day"], r["weight"], r["movement"]) for r in rows] == [(DAY.isoformat(), 70.5, 1)]
+    assert store.weights("priya") == [(DAY.isoformat(), 70.5)]
+    assert not store.flush(timeout=0.2)
+
+    conn.down = False
+    assert store.flush(timeout=5.0)
+    assert not store.failing
+    with sqlite3.connect(path) as db:
+        assert db.execute("SELECT user, day, weight, movement FROM checkins").fetchall() == [("priya", DAY.isoformat(), 70.5, 1)]
+    assert store.last_days("priya", n=1, today=DAY)[0]["weight"] == 70.5
+
+
+def test_newer_check_in_wins_over_a_retried_one(tmp_path):
+    path = str(tmp_path / "checkins.db")
+    store = checkins.CheckinStore(path, max_backoff=0.01)
+    conn = store._writer_conn = FlakyConnection(store._writer_conn)
+    store.record("priya", DAY, weight=70.5)
+    wait_for(lambda: store.failing)
+    store.record("priya", DAY, weight=70.1)
+
+    conn.down = False
+    assert store.flush(timeout=5.0)
+    with sqlite3.connect(path) as db:
+        assert db.execute("SELECT weight FROM checkins").fetchall() == [(70.1,)]
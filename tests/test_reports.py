@@ -0,0 +1,46 @@
+import json
+
+import reports
+
+# --resume must leave the JSONL output exactly as an uninterrupted run would:
+# anything written after the last checkpointed chunk is cut off and rendered again.
+
+
+def write_users(path, n):
+    rows = ["id,name,weight,height,age"] + [f"u{i},User {i},{60 + i},165,30" for i in range(n)]
+    path.write_text("\n".join(rows) + "\n")
+
+
+def output_ids(path):
+    with open(path) as f:
+        return [json.loads(line)["id"] for line in f]
+
+
+def test_resume_after_crash_between_output_and_checkpoint(tmp_path):
+    src, dst = tmp_path / "users.csv", str(tmp_path / "plans.jsonl")
+    write_users(src, 7)
+    assert reports.generate(str(src), dst, workers=1, chunksize=2, progress=None) == (7, 0)
+    expected = output_ids(dst)
+
+    # Crash after the last chunk reached the output but before its checkpoint line
+    # was complete: drop that line, leaving a cut-off fragment of it.
+    checkpoint = dst + ".checkpoint"
+    with open(checkpoint) as f:
+        lines = f.read().splitlines()
+    with open(checkpoint, "w") as f:
+        f.write("\n".join(lines[:-1]) + "\n" + lines[-1][:1])
+
+    rendered, _ = reports.generate(str(src), dst, workers=1, chunksize=2, resume=True, progress=None)
+    assert rendered <= 2  # only the chunk whose checkpoint was lost is rendered again
+    ids = output_ids(dst)
+    assert len(ids) == len(set(ids))
+    assert sorted(ids) == sorted(expected)
+
+
+def test_resume_without_checkpoint_starts_over(tmp_path):
+    src, dst = tmp_path / "users.csv", str(tmp_path / "plans.jsonl")
+    write_users(src, 3)
+    reports.generate(str(src), dst, workers=1, chunksize=2, progress=None)
+    (tmp_path / "plans.jsonl.checkpoint").unlink()
+    reports.generate(str(src), dst, workers=1, chunksize=2, resume=True, progress=None)
+    assert sorted(output_ids(dst)) == ["u0", "u1", "u2"]
@@ -0,0 +1,49 @@
+import pytest
+
+import sessions
+from core.metrics import calculate_metrics
+from core.models import UserProfile
+
+# The session record is a hand-packed binary format; whatever App.py stores must
+# come back unchanged.
+
+
+def roundtrip(session):
+    return sessions.decode(sessions.encode(session))
+
+
+@pytest.mark.parametrize("profile", [
+    UserProfile("Priya Sharma", 72.5, 165.3, "Vegetarian", "I live with family", "Female", 31, 84),
+    UserProfile("Arjun", 95.25, 181.0, "Non-Vegetarian", "I live in a PG/Hostel", "Male", 22, 0),
+    # Values outside the known enums are stored as text after the OTHER marker.
+    UserProfile("Sam", 60.0, 170.0, "Vegan", "With Family", "Non-binary", 45, 70),
+])
+def test_roundtrip(profile):
+    metrics = calculate_metrics(profile)
+    got = roundtrip(sessions.Session(2, profile, metrics))
+    assert got.step == 2
+    assert got.profile == profile
+    assert got.metrics.astuple() == metrics.astuple()
+
+
+def test_roundtrip_without_profile_or_metrics():
+    got = roundtrip(sessions.Session(1))
+    assert (got.step, got.profile, got.metrics) == (1, None, None)
+
+
+def test_longest_utf8_name():
+    name = "é" * 127 + "a"  # 255 bytes of UTF-8, the most a name can take
+    assert len(name.encode()) == 255
+    profile = UserProfile(name, 70.0, 160.0, "Eggetarian", "I cook for myself", "Female", 30, 75)
+    assert roundtrip(sessions.Session(1, profile)).profile.name == name
+
+
+def test_longer_name_is_cut_at_a_character_boundary():
+    name = "é" * 200
+    assert roundtrip(sessions.Session(1, UserProfile(name, 70.0, 160.0))).profile.name == "é" * 127
+
+
+def test_other_version_decodes_as_new_session():
+    data = bytearray(sessions.encode(sessions.Session(2, UserProfile("Priya", 70.0, 160.0))))
+    data[0] = sessions.VERSION + 1
+    assert sessions.decode(bytes(data)).step == 0